@@ -0,0 +1,85 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import COUNT_MASK, MINE_BIT, PYTHON, REVEALED, Board
+
+# Compares click latency with the counter-based win check against the
+# previous full-grid scan, on Expert and on a large custom board.
+#
+#   python benchmarks/bench_win_check.py
+
+BOARDS = {
+    'Expert': (16, 30, 99),
+    'Custom 1000x1000': (1000, 1000, 150000),
+}
+CLICKS = 200
+# Both boards must share a layout, so the clicks taken from one are safe
+# cells on the other
+SEED = 1234
+
+
+class ScanningBoard(Board):
+    # The pre-counter win check: scan every cell after each move
+    def check_win(self):
+        for cell in self.cells:
+            if not cell & (MINE_BIT | REVEALED):
+                return False
+        return True
+
+
+def late_game(board, count, rng):
+    # Reveal every safe cell except `count` numbered ones, then return those
+    # as the clicks to time. This is where the full scan hurts most: it has
+    # to walk past almost the whole revealed grid before it finds a cell.
+    # Each remaining click opens exactly one cell, so the timing is
+    # dominated by the win check rather than the flood fill.
+    cells = board.cells
+    numbered = [i for i, cell in enumerate(cells)
+                if cell & COUNT_MASK and not cell & MINE_BIT]
+    clicks = rng.sample(numbered, min(count, len(numbered)))
+    pending = set(clicks)
+    for i, cell in enumerate(cells):
+        if not cell & MINE_BIT and i not in pending:
+            cells[i] = cell | REVEALED
+            board.safe_remaining -= 1
+    return [board.coords(i) for i in clicks]
+
+
+def time_clicks(board, clicks):
+    latencies = []
+    for row, col in clicks:
+        start = time.perf_counter()
+        board.reveal(row, col)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def report(name, label, latencies):
+    mean = sum(latencies) / len(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    print(f"{name:<18} {label:<8} mean {mean * 1e6:10.1f} us"
+          f"   p50 {p50 * 1e6:10.1f} us   p99 {p99 * 1e6:10.1f} us")
+
+
+def main():
+    for name, (rows, cols, mines) in BOARDS.items():
+        scanning = ScanningBoard(rows, cols, mines, backend=PYTHON, seed=SEED)
+        counting = Board(rows, cols, mines, backend=PYTHON, seed=SEED)
+        for board in (scanning, counting):
+            board.generate(0)
+            board.calculate_numbers()
+        clicks = late_game(counting, CLICKS, random.Random(1))
+        late_game(scanning, CLICKS, random.Random(1))
+
+        report(name, 'scan', time_clicks(scanning, clicks))
+        report(name, 'counter', time_clicks(counting, clicks))
+
+
+if __name__ == '__main__':
+    main()
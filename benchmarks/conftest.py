@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Benchmark runs are stored next to this file. Once a baseline has been saved
+# with --save-baseline, every later run of `pytest benchmarks` compares against
+# it and fails any benchmark whose median regresses past the threshold.
+STORAGE = Path(__file__).resolve().parent / '.benchmarks'
+BASELINE = 'baseline'
+DEFAULT_THRESHOLD = 'median:50%'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('minesweeper benchmarks')
+    group.addoption('--save-baseline', action='store_true',
+                    help="save this run as the baseline later runs are checked against")
+    group.addoption('--regression-threshold', default=DEFAULT_THRESHOLD, metavar='EXPR',
+                    help="how far a benchmark may regress from the baseline before it "
+                         f"fails, as a --benchmark-compare-fail expression (default: {DEFAULT_THRESHOLD})")
+
+
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options
+    if not config.pluginmanager.hasplugin('benchmark'):
+        return
+    from pytest_benchmark.utils import parse_compare_fail
+
+    option = config.option
+    option.benchmark_storage = f'file://{STORAGE}'
+    if config.getoption('save_baseline'):
+        option.benchmark_save = BASELINE
+    elif not option.benchmark_compare and list(STORAGE.glob(f'*/*_{BASELINE}.json')):
+        option.benchmark_compare = True
+        if not option.benchmark_compare_fail:
+            option.benchmark_compare_fail = [parse_compare_fail(config.getoption('regression_threshold'))]
@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from engine import (COUNT_MASK, DIFFICULTY, MINE_BIT, NUMPY, PYTHON, REVEALED, Board,
+                    encode_board_id, np)
+from instrumentation import Instrumentation
+from scores import ScoreStore
+
+# Hot-path benchmarks for the headless engine. Nothing here imports tkinter.
+#
+#   python -m pytest benchmarks --save-baseline   # record a baseline
+#   python -m pytest benchmarks                   # fail on >50% regressions
+
+SIZES = {name: (s['rows'], s['cols'], s['mines']) for name, s in DIFFICULTY.items()}
+SIZES.update({
+    'Custom 100x100': (100, 100, 2000),
+    'Custom 300x300': (300, 300, 18000),
+})
+BACKENDS = [PYTHON] + ([NUMPY] if np is not None else [])
+DENSITIES = [0.05, 0.2, 0.5, 0.8]
+SEED = 1234
+
+
+def generated(rows, cols, mines, backend=PYTHON):
+    board = Board(rows, cols, mines, backend=backend, seed=SEED)
+    board.generate(board.index(rows // 2, cols // 2))
+    return board
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_board_init(benchmark, size):
+    benchmark(Board, *SIZES[size], seed=SEED)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('density', DENSITIES)
+def test_place_mines(benchmark, density, backend):
+    rows = cols = 200
+    mines = int(rows * cols * density)
+
+    def setup():
+        return (Board(rows, cols, mines, backend=backend, seed=SEED),), {}
+
+    benchmark.pedantic(lambda board: board.place_mines(), setup=setup, rounds=50)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('size', SIZES)
+def test_calculate_numbers(benchmark, size, backend):
+    board = generated(*SIZES[size], backend=backend)
+    benchmark(board.calculate_numbers)
+
+
+@pytest.mark.parametrize('size', ['Expert', 'Custom 100x100', 'Custom 300x300'])
+def test_flood_fill_worst_case(benchmark, size):
+    # An empty board: one click opens every cell
+    rows, cols, _ = SIZES[size]
+
+    def setup():
+        return (generated(rows, cols, 0),), {}
+
+    benchmark.pedantic(lambda board: board.reveal(0, 0), setup=setup, rounds=5)
+
+
+def test_chord(benchmark):
+    # Chord the first number on an Expert board whose mines are all flagged
+    rows, cols, mines = SIZES['Expert']
+
+    def setup():
+        board = generated(rows, cols, mines)
+        board.calculate_numbers()
+        for index, cell in enumerate(board.cells):
+            if cell & MINE_BIT:
+                board.toggle_flag(*board.coords(index))
+        number = next(i for i, cell in enumerate(board.cells) if cell & COUNT_MASK)
+        board.cells[number] |= REVEALED
+        return (board, *board.coords(number)), {}
+
+    benchmark.pedantic(lambda board, row, col: board.chord(row, col), setup=setup, rounds=50)
+
+
+@pytest.mark.parametrize('instrumented', [False, True])
+def test_instrumented_reveal(benchmark, instrumented):
+    # Cost of the timing wrappers on a single-cell reveal, the cheapest move
+    rows, cols, mines = SIZES['Expert']
+    board = generated(rows, cols, mines)
+    if instrumented:
+        Instrumentation().attach_board(board)
+    number = next(i for i, cell in enumerate(board.cells)
+                  if not cell & (MINE_BIT | REVEALED) and board.counted(i) & COUNT_MASK)
+    row, col = board.coords(number)
+
+    def reveal():
+        # Cover the cell again so every round does the same work
+        board.cells[number] &= ~REVEALED
+        board.safe_remaining += 1
+        assert board.reveal(row, col) == [number]
+
+    benchmark(reveal)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_check_win(benchmark, size):
+    # Late game: every safe cell but one is open
+    board = generated(*SIZES[size])
+    board.calculate_numbers()
+    safe = [i for i, cell in enumerate(board.cells) if not cell & MINE_BIT]
+    for index in safe[1:]:
+        board.cells[index] |= REVEALED
+    board.safe_remaining = 1
+    assert benchmark(board.check_win) is False
+
+
+@pytest.mark.parametrize('existing', [0, 10000])
+def test_high_score_insertion(benchmark, existing):
+    # A stream of finishing times into one board's leaderboard
+    times = random.Random(SEED).sample(range(100000), 100)
+    board_id = encode_board_id(generated(*SIZES['Expert']))
+
+    def setup():
+        store = ScoreStore(':memory:', legacy_path=None)
+        for time in random.Random(SEED + 1).sample(range(100000), existing):
+            store.add('Expert', time)
+        return (store,), {}
+
+    def insert_all(store):
+        for time in times:
+            store.add('Expert', time, board_id=board_id, clicks=100)
+
+    benchmark.pedantic(insert_all, setup=setup, rounds=10)
+
+
+def test_high_score_queries(benchmark):
+    # Top page and personal best out of 10000 scores
+    store = ScoreStore(':memory:', legacy_path=None)
+    for time in random.Random(SEED).sample(range(100000), 10000):
+        store.add('Expert', time)
+
+    def query():
+        return store.top('Expert'), store.personal_best('Expert')
+
+    benchmark(query)
@@ -0,0 +1,310 @@
+import tkinter as tk
+
+# Room left around the board on screen; larger boards scroll
+SCREEN_MARGIN = (100, 200)
+
+
+class BoardView(tk.Canvas):
+    # Draws the grid as image items on a single canvas. Only the cells inside
+    # the visible viewport have an item at all; scrolling creates the items
+    # that come into view and deletes those that leave it, so the cost of
+    # drawing depends on the window size, not the board size. Items are only
+    # re-pointed at another sprite when a cell actually changes.
+    #
+    # Changed cells are queued with mark_dirty and redrawn together on the
+    # next idle tick, as one Tcl script, so a cascade or game over costs a
+    # single round trip into Tk however many cells it touches.
+    def __init__(self, master, images, image_for, on_reveal, on_flag, on_chord):
+        super().__init__(master, highlightthickness=0, borderwidth=0)
+        self.images = images
+        self.image_for = image_for  # cell index -> sprite name
+        self.cell_size = images['covered'].width()
+        self.config(xscrollincrement=self.cell_size, yscrollincrement=self.cell_size)
+        self.on_reveal = on_reveal
+        self.on_flag = on_flag
+        self.on_chord = on_chord
+        self.rows = 0
+        self.cols = 0
+        self.items = {}        # cell index -> canvas item id, visible cells only
+        self.cell_images = {}  # cell index -> sprite name shown, visible cells only
+        self.viewport = None   # (first row, last row, first col, last col), exclusive
+        self.viewport_job = None
+        self.hints = {}        # cell index -> mine probability to overlay
+        self.banner = None     # (title, text) of the result shown over the board
+        self.banner_closes = True  # ... and whether a click on it hides it
+        self.xscrollbar = None
+        self.yscrollbar = None
+        self.dirty = set()
+        self.flush_job = None
+        self.draw_ops = 0       # item reconfigurations issued in total
+        self.last_draw_ops = 0  # ... and by the most recent flush
+        self.config(xscrollcommand=self.handle_xscroll, yscrollcommand=self.handle_yscroll)
+
+        # Chording: a middle click, or left and right pressed together and
+        # released on a number
+        self.buttons = set()   # mouse buttons held down
+        self.chording = False  # both buttons went down together
+        self.chorded = False   # ... and the chord has already fired
+
+        self.bind('<Button-1>', self.handle_left_press)
+        self.bind('<ButtonRelease-1>', self.handle_left_click)
+        self.bind('<Button-3>', self.handle_right_click)
+        self.bind('<ButtonRelease-3>', self.handle_right_release)
+        self.bind('<ButtonRelease-2>', self.handle_middle_click)
+        self.bind('<MouseWheel>', self.handle_wheel)
+        self.bind('<Shift-MouseWheel>', self.handle_wheel)
+        self.bind('<Button-4>', self.handle_wheel)
+        self.bind('<Button-5>', self.handle_wheel)
+        self.bind('<Shift-Button-4>', self.handle_wheel)
+        self.bind('<Shift-Button-5>', self.handle_wheel)
+
+    def set_scrollbars(self, xscrollbar, yscrollbar):
+        # Scrollbars already placed with grid; they are hidden while the
+        # whole board fits
+        self.xscrollbar, self.yscrollbar = xscrollbar, yscrollbar
+        xscrollbar.config(command=self.xview)
+        yscrollbar.config(command=self.yview)
+
+    def reset(self, rows, cols):
+        self.cancel_flush()
+        self.clear_hints()
+        self.clear_banner()
+        if (rows, cols) == (self.rows, self.cols):
+            # Same size: one call points every visible cell back at the
+            # covered sprite
+            self.itemconfig('cell', image=self.images['covered'])
+            self.cell_images = dict.fromkeys(self.items, 'covered')
+            return
+
+        self.delete('all')
+        self.items = {}
+        self.cell_images = {}
+        self.viewport = None
+        self.rows, self.cols = rows, cols
+        size = self.cell_size
+        width, height = cols * size, rows * size
+        view_width = min(width, self.winfo_screenwidth() - SCREEN_MARGIN[0])
+        view_height = min(height, self.winfo_screenheight() - SCREEN_MARGIN[1])
+        self.config(width=view_width, height=view_height, scrollregion=(0, 0, width, height))
+        self.xview_moveto(0)
+        self.yview_moveto(0)
+        for scrollbar, needed in ((self.xscrollbar, view_width < width),
+                                  (self.yscrollbar, view_height < height)):
+            if scrollbar is not None:
+                if needed:
+                    scrollbar.grid()
+                else:
+                    scrollbar.grid_remove()
+        self.update_viewport()
+
+    def handle_xscroll(self, first, last):
+        if self.xscrollbar is not None:
+            self.xscrollbar.set(first, last)
+        self.schedule_viewport()
+
+    def handle_yscroll(self, first, last):
+        if self.yscrollbar is not None:
+            self.yscrollbar.set(first, last)
+        self.schedule_viewport()
+
+    def handle_wheel(self, event):
+        # Three cells per notch; with Shift, scroll sideways
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        if event.state & 1:
+            self.xview_scroll(step, 'units')
+        else:
+            self.yview_scroll(step, 'units')
+
+    def schedule_viewport(self):
+        if self.viewport_job is None:
+            self.viewport_job = self.after_idle(self.update_viewport)
+
+    def update_viewport(self):
+        # Create items for cells that scrolled into view and delete the ones
+        # that left it
+        self.viewport_job = None
+        size = self.cell_size
+        left, top = int(self.canvasx(0)), int(self.canvasy(0))
+        width = self.winfo_width() if self.winfo_ismapped() else int(self['width'])
+        height = self.winfo_height() if self.winfo_ismapped() else int(self['height'])
+        viewport = (max(top // size, 0), min((top + height) // size + 1, self.rows),
+                    max(left // size, 0), min((left + width) // size + 1, self.cols))
+        if viewport == self.viewport:
+            return
+        self.viewport = viewport
+        row_start, row_stop, col_start, col_stop = viewport
+
+        items, cell_images, cols = self.items, self.cell_images, self.cols
+        hidden = [index for index in items
+                  if not (row_start <= index // cols < row_stop
+                          and col_start <= index % cols < col_stop)]
+        if hidden:
+            self.delete(*(items.pop(index) for index in hidden))
+            for index in hidden:
+                del cell_images[index]
+
+        images = self.images
+        for row in range(row_start, row_stop):
+            base = row * cols
+            for col in range(col_start, col_stop):
+                index = base + col
+                if index not in items:
+                    name = self.image_for(index)
+                    items[index] = self.create_image(col * size, row * size, image=images[name],
+                                                     anchor='nw', tags='cell')
+                    cell_images[index] = name
+        self.draw_hints()
+        self.draw_banner()
+
+    def mark_dirty(self, cells):
+        if len(cells) > len(self.items):
+            # Cheaper to recheck every visible cell than to filter a cascade
+            # across a huge board
+            self.dirty.update(self.items)
+        else:
+            self.dirty.update(cells)
+        if self.dirty and self.flush_job is None:
+            self.flush_job = self.after_idle(self.flush)
+
+    def cancel_flush(self):
+        if self.flush_job is not None:
+            self.after_cancel(self.flush_job)
+            self.flush_job = None
+        self.dirty.clear()
+
+    def flush(self):
+        self.flush_job = None
+        path = str(self)
+        items, cell_images = self.items, self.cell_images
+        commands = []
+        for index in self.dirty:
+            if index not in items:
+                continue  # off screen; drawn when it scrolls into view
+            name = self.image_for(index)
+            if cell_images[index] != name:
+                cell_images[index] = name
+                commands.append(f'{path} itemconfigure {items[index]} '
+                                f'-image {self.images[name]}')
+        self.dirty.clear()
+        if commands:
+            self.tk.eval('\n'.join(commands))
+        self.last_draw_ops = len(commands)
+        self.draw_ops += len(commands)
+
+    def show_hints(self, probabilities):
+        # Overlay each given cell with its chance of holding a mine
+        self.hints = probabilities
+        self.draw_hints()
+
+    def draw_hints(self):
+        # Hints for the visible cells, shaded from green (safe) to red
+        # (certain mine)
+        self.delete('hint')
+        size = self.cell_size
+        for index in self.items:
+            p = self.hints.get(index)
+            if p is None:
+                continue
+            row, col = divmod(index, self.cols)
+            red = int(200 * p)
+            self.create_text(col * size + size // 2, row * size + size // 2,
+                             text=f'{p:.0%}', fill=f'#{red:02x}{200 - red:02x}00',
+                             font=('Arial', 9, 'bold'), tags='hint')
+        self.tag_raise('banner')
+
+    def clear_hints(self):
+        self.hints = {}
+        self.delete('hint')
+
+    def show_banner(self, title, text, closes=True):
+        # A result laid over the middle of the visible board. It leaves the
+        # event loop running, and a click on it hides it to show the board,
+        # unless closes is False; then it stays until clear_banner. Clicks
+        # on it never reach the cells beneath.
+        self.banner = (title, text)
+        self.banner_closes = closes
+        self.draw_banner()
+
+    def draw_banner(self):
+        self.delete('banner')
+        if self.banner is None:
+            return
+        title, text = self.banner
+        width = self.winfo_width() if self.winfo_ismapped() else int(self['width'])
+        height = self.winfo_height() if self.winfo_ismapped() else int(self['height'])
+        x = int(self.canvasx(0)) + width // 2
+        y = int(self.canvasy(0)) + height // 2
+        label = self.create_text(x, y, text=f'{title}\n{text}', justify='center',
+                                 width=max(width - 60, 120), font=('Arial', 13, 'bold'),
+                                 tags='banner')
+        left, top, right, bottom = self.bbox(label)
+        box = self.create_rectangle(left - 16, top - 10, right + 16, bottom + 10,
+                                    fill='#f0f0f0', outline='#333333', width=2, tags='banner')
+        self.tag_lower(box, label)
+
+    def clear_banner(self):
+        self.banner = None
+        self.delete('banner')
+
+    def cell_at(self, x, y):
+        row = int(self.canvasy(y)) // self.cell_size
+        col = int(self.canvasx(x)) // self.cell_size
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def handle_left_press(self, event):
+        self.buttons.add(1)
+        if 3 in self.buttons:
+            self.chording = True
+
+    def over_banner(self):
+        # Whether the pointer is on the banner, which is drawn above every cell
+        return self.banner is not None and 'banner' in self.gettags('current')
+
+    def handle_left_click(self, event):
+        if self.release(1, event):
+            return
+        if self.over_banner():
+            if self.banner_closes:
+                self.clear_banner()
+            return
+        cell = self.cell_at(event.x, event.y)
+        if cell:
+            self.on_reveal(*cell)
+
+    def handle_right_click(self, event):
+        self.buttons.add(3)
+        if 1 in self.buttons:
+            self.chording = True
+            return
+        if self.over_banner():
+            return
+        cell = self.cell_at(event.x, event.y)
+        if cell:
+            self.on_flag(*cell)
+
+    def handle_right_release(self, event):
+        self.release(3, event)
+
+    def handle_middle_click(self, event):
+        if self.over_banner():
+            return
+        cell = self.cell_at(event.x, event.y)
+        if cell:
+            self.on_chord(*cell)
+
+    def release(self, button, event):
+        # The first button let go of a two-button press fires the chord; the
+        # second is swallowed. Returns True for either.
+        self.buttons.discard(button)
+        if not self.chording:
+            return False
+        if not self.chorded:
+            self.chorded = True
+            cell = None if self.over_banner() else self.cell_at(event.x, event.y)
+            if cell:
+                self.on_chord(*cell)
+        if not self.buttons:
+            self.chording = self.chorded = False
+        return True
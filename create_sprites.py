@@ -1,5 +1,45 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 from PIL import Image, ImageDraw, ImageFont
 
+FONT_PATH = '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'
+OUTPUT_DIR = 'assets'
+# Size of the individual GIFs, the cell size the game has always used
+BASE_SIZE = 40
+# Cell sizes in the atlas: smaller for zoomed-out large boards, larger for
+# HiDPI screens and zoomed-in views
+SIZES = (20, 30, 40, 60, 80)
+ATLAS = 'sprites.png'
+INDEX = 'sprites.json'
+CACHE_DIR = '.sprite-cache'
+
+# Game sprite name -> (drawing function, its keyword arguments, individual file)
+SPRITES = {
+    'covered': ('create_cell', {'state': 'covered'}, 'cell_covered'),
+    'uncovered': ('create_cell', {'state': 'uncovered'}, 'cell_uncovered'),
+    'mine': ('create_mine', {}, 'mine'),
+    'flag': ('create_flag', {}, 'flag'),
+    'wrong': ('create_wrong_mine', {}, 'wrong_mine'),
+}
+for i in range(1, 9):
+    SPRITES[str(i)] = ('create_number', {'number': i}, f'number_{i}')
+
+
+@lru_cache(maxsize=None)
+def load_font(font_size):
+    # Loaded once per size and process, not once per sprite
+    try:
+        return ImageFont.truetype(FONT_PATH, size=font_size)
+    except OSError:
+        return ImageFont.load_default()
+
+
 def create_cell(size=30, state='covered'):
     img = Image.new('RGB', (size, size), '#c0c0c0')
     draw = ImageDraw.Draw(img)
@@ -102,12 +142,8 @@ def create_number(number, size=30):
     img = create_cell(size, 'uncovered')
     draw = ImageDraw.Draw(img)
     
-    # Use a large, bold font
-    try:
-        font_size = int(size * 0.8)  # Use 80% of cell size
-        font = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', size=font_size)
-    except:
-        font = ImageFont.load_default()
+    # Use a large, bold font, 80% of the cell size
+    font = load_font(int(size * 0.8))
     
     # Draw number
     color = colors.get(number, '#000000')
@@ -130,24 +166,122 @@ def create_number(number, size=30):
     
     return img
 
-# Create and save all sprites
-size = 40  # Larger size for better visibility
+def renderer_digest():
+    # Changes whenever the drawing code or the font does, so editing a
+    # sprite's look invalidates the cache without a manual version bump
+    digest = hashlib.sha256()
+    for function in (create_cell, create_mine, create_flag, create_wrong_mine, create_number):
+        digest.update(inspect.getsource(function).encode())
+    try:
+        stat = os.stat(FONT_PATH)
+        digest.update(f'{FONT_PATH}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    except OSError:
+        digest.update(b'default font')
+    return digest.hexdigest()
+
+
+def sprite_hash(renderer, name, size):
+    function, kwargs, _ = SPRITES[name]
+    key = json.dumps([renderer, name, function, kwargs, size], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def render(name, size, path):
+    # Draw one sprite into the cache; runs in a worker process
+    function, kwargs, _ = SPRITES[name]
+    img = globals()[function](size=size, **kwargs)
+    img.save(path, 'PNG')
+    return name, size
+
 
 def save_image(img, path):
     # Convert to RGB mode and save as GIF (better tkinter compatibility)
     if img.mode != 'RGB':
         img = img.convert('RGB')
-    img.save(path.replace('.png', '.gif'), 'GIF')
+    img.save(path, 'GIF')
+
 
-# Basic cells
-save_image(create_cell(size), 'assets/cell_covered.png')
-save_image(create_cell(size, 'uncovered'), 'assets/cell_uncovered.png')
+def build(output_dir=OUTPUT_DIR, sizes=SIZES, jobs=None, force=False):
+    # Render every sprite at every size, reusing cached renders whose
+    # parameters are unchanged, then pack them into one atlas with a JSON
+    # index and refresh the individual BASE_SIZE GIFs. Returns counts of the
+    # sprites rendered and reused, and whether the atlas was rewritten.
+    cache_dir = os.path.join(output_dir, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(output_dir, INDEX)
+    atlas_path = os.path.join(output_dir, ATLAS)
+    try:
+        with open(index_path) as f:
+            previous = json.load(f).get('hashes', {})
+    except (OSError, ValueError):
+        previous = {}
 
-# Mine and flag
-save_image(create_mine(size), 'assets/mine.png')
-save_image(create_flag(size), 'assets/flag.png')
-save_image(create_wrong_mine(size), 'assets/wrong_mine.png')
+    renderer = renderer_digest()
+    sizes = sorted(set(sizes) | {BASE_SIZE})
+    hashes = {f'{size}/{name}': sprite_hash(renderer, name, size)
+              for size in sizes for name in SPRITES}
 
-# Numbers
-for i in range(1, 9):
-    save_image(create_number(i, size), f'assets/number_{i}.png')
+    def cached(key):
+        return os.path.join(cache_dir, f'{hashes[key]}.png')
+
+    missing = [(name, size, cached(f'{size}/{name}')) for size in sizes for name in SPRITES
+               if force or not os.path.exists(cached(f'{size}/{name}'))]
+    if len(missing) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(render, *zip(*missing)))
+    else:
+        for task in missing:
+            render(*task)
+
+    changed = force or bool(missing) or hashes != previous or not os.path.exists(atlas_path)
+    if changed:
+        # One shelf per size, the sprites left to right in SPRITES order
+        width = max(sizes) * len(SPRITES)
+        atlas = Image.new('RGB', (width, sum(sizes)), '#c0c0c0')
+        index = {'image': ATLAS, 'sizes': {}, 'hashes': hashes}
+        y = 0
+        for size in sizes:
+            frames = index['sizes'][str(size)] = {}
+            for x, name in enumerate(SPRITES):
+                with Image.open(cached(f'{size}/{name}')) as img:
+                    atlas.paste(img, (x * size, y))
+                frames[name] = [x * size, y, size, size]
+            y += size
+        atlas.save(atlas_path, 'PNG', optimize=True)
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+
+    # The single GIFs are what sprites.load_files reads when the atlas is
+    # missing or Tk has no PNG support (before 8.6); nothing else uses them
+    for name, (_, _, filename) in SPRITES.items():
+        key = f'{BASE_SIZE}/{name}'
+        path = os.path.join(output_dir, f'{filename}.gif')
+        if force or previous.get(key) != hashes[key] or not os.path.exists(path):
+            with Image.open(cached(key)) as img:
+                save_image(img, path)
+
+    # Drop renders no longer referenced
+    current = {f'{value}.png' for value in hashes.values()}
+    for entry in os.listdir(cache_dir):
+        if entry not in current:
+            os.remove(os.path.join(cache_dir, entry))
+
+    return {'rendered': len(missing), 'reused': len(hashes) - len(missing), 'atlas': changed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the game's sprites and sprite atlas.")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Directory to write into")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, metavar='PX',
+                        help="Cell sizes to render")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Ignore the render cache")
+    args = parser.parse_args()
+    result = build(args.output, args.sizes, args.jobs, args.force)
+    print(f"{result['rendered']} sprites rendered, {result['reused']} cached; "
+          f"atlas {'written' if result['atlas'] else 'unchanged'}")
+
+
+if __name__ == '__main__':
+    main()
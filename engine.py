@@ -0,0 +1,553 @@
+import base64
+import binascii
+import random
+import struct
+import zlib
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python backend always works
+    np = None
+
+from presets import DIFFICULTY
+
+# Game states
+PLAYING = 'playing'
+WON = 'won'
+LOST = 'lost'
+
+# Moves, as reported to a board's move log
+REVEAL = 'reveal'
+FLAG = 'flag'
+CHORD = 'chord'
+UNDO = 'undo'
+REDO = 'redo'
+
+# Cell values: 0-8 is the number of adjacent mines, MINE marks a mine
+MINE = 9
+
+# Board generation backends
+PYTHON = 'python'
+NUMPY = 'numpy'
+DEFAULT_BACKEND = NUMPY if np is not None else PYTHON
+
+# Each cell is one byte of Board.cells:
+#
+#   bits 0-3  COUNT_MASK  adjacent mine count (0-8)
+#   bit 4     MINE_BIT    the cell holds a mine
+#   bit 5     REVEALED    the cell has been opened
+#   bit 6     FLAGGED     the cell carries a flag
+#   bit 7     COUNTED     the count bits are valid; counts are filled in
+#                         lazily, the first time a cell is opened
+COUNT_MASK = 0x0F
+MINE_BIT = 0x10
+REVEALED = 0x20
+FLAGGED = 0x40
+COUNTED = 0x80
+
+
+def _table(func):
+    # 256-entry bytes.translate table mapping each cell byte to func(byte)
+    return bytes(func(cell) for cell in range(256))
+
+
+# Translation tables let whole-board scans run at C speed via translate()
+RESET_COUNTS = _table(lambda cell: cell & ~COUNT_MASK | COUNTED)
+MINE_MARKS = _table(lambda cell: int(bool(cell & MINE_BIT)))
+MINE_DIGITS = _table(lambda cell: ord('1') if cell & MINE_BIT else ord('0'))
+DIGIT_MINES = _table(lambda cell: MINE_BIT if cell == ord('1') else 0)
+# Hidden mines and flags on safe cells, shown once the game is lost
+EXPOSED = _table(lambda cell: int(not cell & REVEALED
+                                  and bool(cell & FLAGGED) != bool(cell & MINE_BIT)))
+FLAG_MARKS = _table(lambda cell: int(bool(cell & FLAGGED)))
+COVERED_SAFE = _table(lambda cell: int(not cell & (REVEALED | MINE_BIT)))
+EXPLODED = _table(lambda cell: int(cell & (REVEALED | MINE_BIT) == REVEALED | MINE_BIT))
+
+
+class Board:
+    # Mines are not placed until the first reveal, which is always safe. With
+    # safe_neighbours the cells around it are kept clear as well, so the
+    # first click opens an area whenever the board has room for it.
+    #
+    # The layout is drawn from `seed` (a random one when omitted), so the
+    # same seed, backend and first click always produce the same board.
+    # With no_guess the layout is one the solver can finish without guessing.
+    def __init__(self, rows, cols, mines, backend=None, safe_neighbours=True, seed=None,
+                 no_guess=False):
+        if backend == NUMPY and np is None:
+            raise ValueError("The numpy backend requires NumPy to be installed")
+        if rows < 1 or cols < 1:
+            raise ValueError("A board needs at least one row and one column")
+        if not 0 <= mines < rows * cols:
+            raise ValueError("A board needs at least one cell without a mine")
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.backend = backend or DEFAULT_BACKEND
+        self.safe_neighbours = safe_neighbours
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.no_guess = no_guess
+        self.generated = False
+        # The whole game state, one byte per cell in row-major order. The
+        # GUI, solvers and serialisers all read this buffer directly.
+        self.cells = bytearray(rows * cols)
+        self.flags_placed = 0
+        # Unrevealed cells without a mine; the game is won when it hits zero
+        self.safe_remaining = rows * cols - mines
+        self.state = PLAYING
+        # Optional move log with a record(board, move, index) method, told
+        # about every move that changed the board
+        self.log = None
+        # Undo is on once history is a list. Each entry is one move's delta:
+        # (mask, indices, counters before, counters after), where XOR-ing
+        # mask into the cells at indices flips the move either way. A move
+        # costs memory and undo/redo time in proportion to the cells it
+        # changed, never to the board.
+        self.history = None
+        self.future = []  # undone deltas, for redo
+
+    @property
+    def game_over(self):
+        return self.state != PLAYING
+
+    @property
+    def mines_left(self):
+        return self.mines - self.flags_placed
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def coords(self, index):
+        return divmod(index, self.cols)
+
+    def value(self, row, col):
+        cell = self.counted(row * self.cols + col)
+        return MINE if cell & MINE_BIT else cell & COUNT_MASK
+
+    def counted(self, index):
+        # The cell byte with its count bits filled in
+        cell = self.cells[index]
+        if cell & COUNTED:
+            return cell
+        cells = self.cells
+        if not cell & MINE_BIT:
+            cell |= sum(1 for n in self.neighbours(index) if cells[n] & MINE_BIT)
+        cell |= COUNTED
+        cells[index] = cell
+        return cell
+
+    def is_revealed(self, row, col):
+        return bool(self.cells[row * self.cols + col] & REVEALED)
+
+    def is_flagged(self, row, col):
+        return bool(self.cells[row * self.cols + col] & FLAGGED)
+
+    def buffer(self):
+        # Zero-copy view of the cell bytes
+        return memoryview(self.cells)
+
+    def as_array(self):
+        # Zero-copy (rows, cols) uint8 NumPy view of the cell bytes
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    def neighbours(self, index):
+        cols = self.cols
+        row, col = divmod(index, cols)
+        if 0 < row < self.rows - 1 and 0 < col < cols - 1:
+            # Interior cells, by far the most common, need no bounds checks
+            up, down = index - cols, index + cols
+            return [up - 1, up, up + 1, index - 1, index + 1, down - 1, down, down + 1]
+        result = []
+        for r in range(max(row - 1, 0), min(row + 2, self.rows)):
+            base = r * cols
+            for c in range(max(col - 1, 0), min(col + 2, cols)):
+                if r != row or c != col:
+                    result.append(base + c)
+        return result
+
+    def mine_bitmap(self):
+        # The mine layer as a bitset, one bit per cell, most significant bit
+        # first and zero-padded to a whole byte (the np.packbits layout)
+        cells = len(self.cells)
+        if not cells:
+            return b''
+        digits = self.cells.translate(MINE_DIGITS) + b'0' * (-cells % 8)
+        return int(digits, 2).to_bytes(len(digits) // 8, 'big')
+
+    def set_mine_bitmap(self, bitmap):
+        # Replace the mine layout with a bitset from mine_bitmap(); the rest
+        # of the state, and the undo history, is reset
+        cells = len(self.cells)
+        digits = bin(int.from_bytes(bitmap, 'big'))[2:].zfill(len(bitmap) * 8)
+        self.cells[:] = digits[:cells].encode().translate(DIGIT_MINES)
+        self.mines = self.cells.count(MINE_BIT)
+        self.flags_placed = 0
+        self.safe_remaining = cells - self.mines
+        self.state = PLAYING
+        self.generated = True
+        self.clear_history()
+        self.calculate_numbers()
+
+    def set_mines(self, positions):
+        # Replace the mine layout with the given cells; the rest of the state,
+        # and the undo history, is reset and counts are filled in lazily again
+        cells = self.cells
+        cells[:] = bytes(len(cells))
+        for position in positions:
+            cells[position] = MINE_BIT
+        self.mines = cells.count(MINE_BIT)
+        self.flags_placed = 0
+        self.safe_remaining = len(cells) - self.mines
+        self.state = PLAYING
+        self.generated = True
+        self.clear_history()
+
+    def load_cells(self, cells):
+        # Restore a saved copy of the cell bytes, deriving the counters and
+        # the game state from them. Any undo history is dropped.
+        self.cells[:] = cells
+        self.generated = True
+        self.clear_history()
+        self.mines = self.cells.translate(MINE_MARKS).count(1)
+        self.flags_placed = self.cells.translate(FLAG_MARKS).count(1)
+        self.safe_remaining = self.cells.translate(COVERED_SAFE).count(1)
+        if self.cells.translate(EXPLODED).count(1):
+            self.state = LOST
+        elif self.safe_remaining == 0:
+            self.state = WON
+        else:
+            self.state = PLAYING
+
+    def generate(self, first_index, count=True, positions=None):
+        # Place the mines around the first revealed cell. With count=False
+        # the NumPy backend's up-front count is left to the caller; cells
+        # left uncounted are counted lazily as they open, so either is safe.
+        #
+        # A no-guess layout is searched for here unless positions already
+        # holds one (see no_guess.LayoutSearch). If the search comes up
+        # empty the board gets an ordinary layout and no_guess is turned off.
+        if self.no_guess and positions is None:
+            # Imported here: the generator is built on the solver, which
+            # imports this module
+            from no_guess import no_guess_layout
+            positions = no_guess_layout(self.rows, self.cols, self.mines, first_index,
+                                        seed=self.seed, safe_neighbours=self.safe_neighbours)
+            if positions is None:
+                self.no_guess = False
+        if self.no_guess:
+            cells = self.cells
+            for position in positions:
+                # Like place_mines, keep any flags placed before the first click
+                cells[position] |= MINE_BIT
+        else:
+            self.place_mines(self.safe_cells(first_index))
+        # Only the NumPy backend counts every cell up front, since it does so
+        # in one vectorised pass; otherwise counts are filled in as cells open
+        if count and self.backend == NUMPY:
+            self.calculate_numbers()
+        self.generated = True
+
+    def safe_cells(self, first_index):
+        # Cells that must stay clear of mines, shrinking the zone when the
+        # board is too crowded to keep the whole neighbourhood free
+        free = len(self.cells) - self.mines
+        zone = [first_index]
+        if self.safe_neighbours:
+            zone += self.neighbours(first_index)
+        return sorted(zone) if len(zone) <= free else [first_index]
+
+    def place_mines(self, excluded=()):
+        # Draw from the cells that are not excluded, then shift each draw past
+        # the excluded cells at or below it (excluded must be sorted)
+        cells = self.cells
+        choices = len(cells) - len(excluded)
+        if self.backend == NUMPY:
+            rng = np.random.default_rng(self.seed)
+            positions = rng.choice(choices, self.mines, replace=False)
+            for skipped in excluded:
+                positions[positions >= skipped] += 1
+            self.as_array().reshape(-1)[positions] |= MINE_BIT
+            return
+        for position in random.Random(self.seed).sample(range(choices), self.mines):
+            for skipped in excluded:
+                if position >= skipped:
+                    position += 1
+            cells[position] |= MINE_BIT
+
+    def calculate_numbers(self):
+        # Count every cell at once, rather than lazily as cells open
+        cells = self.cells
+        cells[:] = cells.translate(RESET_COUNTS)
+        if self.backend == NUMPY:
+            grid = self.as_array()
+            mask = (grid & MINE_BIT) != 0
+            grid |= np.where(mask, 0, neighbour_counts(mask)).astype(np.uint8)
+            return
+
+        # Each mine bumps its neighbours, which costs O(mines) rather than a
+        # 3x3 scan around every cell
+        mines = cells.translate(MINE_MARKS)
+        position = mines.find(1)
+        while position != -1:
+            for neighbour in self.neighbours(position):
+                if not mines[neighbour]:
+                    cells[neighbour] += 1
+            position = mines.find(1, position + 1)
+
+    # Every move returns the indices of the cells whose appearance it
+    # changed, so a view can redraw exactly those and nothing else.
+
+    def reveal(self, row, col):
+        index = row * self.cols + col
+        if self.game_over or self.cells[index] & (REVEALED | FLAGGED):
+            return []
+        if not self.generated:
+            self.generate(index)
+
+        before = self.counters()
+        opened = self.flood_fill([index])
+
+        if self.cells[index] & MINE_BIT:
+            self.state = LOST
+        else:
+            self.safe_remaining -= len(opened)
+            if self.check_win():
+                self.state = WON
+        self.remember(REVEALED, opened, before)
+        if self.state == LOST:
+            opened.extend(self.exposed_cells())
+        if self.log is not None:
+            self.log.record(self, REVEAL, index)
+        return opened
+
+    def flood_fill(self, seeds):
+        # Breadth-first reveal starting from every seed at once. Each cell is
+        # queued at most once, so opening a region costs O(region size) and
+        # never recurses, however large the board is.
+        cells, rows, cols = self.cells, self.rows, self.cols
+        counted = self.counted
+        opened = []
+        queue = deque()
+        for index in seeds:
+            cell = cells[index]
+            if cell & (REVEALED | FLAGGED):
+                continue
+            cell = counted(index)
+            cells[index] = cell | REVEALED
+            opened.append(index)
+            if not cell & (COUNT_MASK | MINE_BIT):
+                queue.append(index)
+        while queue:
+            row, col = divmod(queue.popleft(), cols)
+            col_start, col_stop = max(col - 1, 0), min(col + 2, cols)
+            for r in range(max(row - 1, 0), min(row + 2, rows)):
+                base = r * cols
+                for neighbour in range(base + col_start, base + col_stop):
+                    cell = cells[neighbour]
+                    if not cell & (REVEALED | FLAGGED):
+                        if not cell & COUNTED:
+                            cell = counted(neighbour)
+                        cells[neighbour] = cell | REVEALED
+                        opened.append(neighbour)
+                        # Neighbours of an empty cell are never mines
+                        if not cell & COUNT_MASK:
+                            queue.append(neighbour)
+        return opened
+
+    def toggle_flag(self, row, col):
+        index = row * self.cols + col
+        cell = self.cells[index]
+        if self.game_over or cell & REVEALED:
+            return []
+
+        before = self.counters()
+        if not cell & FLAGGED:
+            if self.flags_placed >= self.mines:
+                return []
+            self.flags_placed += 1
+        else:
+            self.flags_placed -= 1
+        self.cells[index] = cell ^ FLAGGED
+        self.remember(FLAGGED, [index], before)
+        if self.log is not None:
+            self.log.record(self, FLAG, index)
+        return [index]
+
+    def chord(self, row, col):
+        # Open every unflagged neighbour of a revealed number whose
+        # mines are all flagged. The neighbours and their cascades open as
+        # one flood fill, with a single win check at the end.
+        index = row * self.cols + col
+        cells = self.cells
+        cell = cells[index]
+        if self.game_over or not cell & REVEALED or not cell & COUNT_MASK:
+            return []
+        neighbours = self.neighbours(index)
+        flags = sum(1 for n in neighbours if cells[n] & FLAGGED)
+        if flags != cell & COUNT_MASK:
+            return []
+
+        before = self.counters()
+        opened = self.flood_fill(neighbours)
+        if not opened:
+            return opened
+        # Mines opened because a flag was on the wrong cell
+        exploded = sum(1 for n in neighbours if cells[n] & MINE_BIT and cells[n] & REVEALED)
+        self.safe_remaining -= len(opened) - exploded
+        if exploded:
+            self.state = LOST
+        elif self.check_win():
+            self.state = WON
+        self.remember(REVEALED, opened, before)
+        if self.state == LOST:
+            opened.extend(self.exposed_cells())
+        if self.log is not None:
+            self.log.record(self, CHORD, index)
+        return opened
+
+    def counters(self):
+        return self.flags_placed, self.safe_remaining, self.state
+
+    def remember(self, mask, indices, before):
+        # Push a move's delta onto the undo history; a new move ends any
+        # chance to redo
+        if self.history is not None:
+            self.history.append((mask, array('I', indices), before, self.counters()))
+            self.future.clear()
+
+    def clear_history(self):
+        if self.history is not None:
+            self.history.clear()
+        self.future.clear()
+
+    def undo(self):
+        # Take back the last move. Returns the cells whose appearance changed.
+        if not self.history:
+            return []
+        delta = self.history.pop()
+        self.future.append(delta)
+        return self.apply_delta(delta, delta[2], UNDO)
+
+    def redo(self):
+        if not self.future:
+            return []
+        delta = self.future.pop()
+        self.history.append(delta)
+        return self.apply_delta(delta, delta[3], REDO)
+
+    def apply_delta(self, delta, counters, move):
+        mask, indices = delta[0], delta[1]
+        cells = self.cells
+        for index in indices:
+            cells[index] ^= mask
+        was_lost = self.state == LOST
+        self.flags_placed, self.safe_remaining, self.state = counters
+        changed = list(indices)
+        if was_lost != (self.state == LOST):
+            # Hidden mines and wrong flags are shown or hidden again
+            changed.extend(self.exposed_cells())
+        if self.log is not None:
+            self.log.record(self, move, None)
+        return changed
+
+    def exposed_cells(self):
+        # Cells shown differently once the game is lost: hidden mines and
+        # flags placed on safe cells
+        marks = self.cells.translate(EXPOSED)
+        cells = []
+        position = marks.find(1)
+        while position != -1:
+            cells.append(position)
+            position = marks.find(1, position + 1)
+        return cells
+
+    def check_win(self):
+        return self.safe_remaining == 0
+
+
+def board_name(rows, cols, mines):
+    # The preset a size belongs to, or a name for a custom size. Also the
+    # key its high scores are kept under.
+    for name, settings in DIFFICULTY.items():
+        if (settings['rows'], settings['cols'], settings['mines']) == (rows, cols, mines):
+            return name
+    return f'Custom {rows}x{cols}/{mines}'
+
+
+# Board IDs are the URL-safe base64 of a version byte, the board size and the
+# zlib-compressed mine bitmap. They pin down the exact layout, independent of
+# seed, backend or first click, so any machine can rebuild the board.
+BOARD_ID_VERSION = 1
+BOARD_ID_HEADER = struct.Struct('>BII')
+
+
+def encode_board_id(board):
+    if not board.generated:
+        raise ValueError("Mines are placed on the first reveal; there is no layout yet")
+    return layout_board_id(board.rows, board.cols, board.mine_bitmap())
+
+
+def layout_board_id(rows, cols, bitmap):
+    # The ID of a rows x cols board from its mine_bitmap(). Compressing is
+    # most of the cost on large boards; the default level is several times
+    # faster than level 9 and hardly bigger on random layouts.
+    header = BOARD_ID_HEADER.pack(BOARD_ID_VERSION, rows, cols)
+    payload = header + zlib.compress(bitmap)
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+
+
+def decode_board_id(board_id, backend=None):
+    # Rebuild the board an ID was made from, ready for its first move
+    try:
+        payload = base64.urlsafe_b64decode(board_id + '=' * (-len(board_id) % 4))
+        version, rows, cols = BOARD_ID_HEADER.unpack_from(payload)
+        bitmap = zlib.decompress(payload[BOARD_ID_HEADER.size:])
+    except (binascii.Error, struct.error, zlib.error, ValueError):
+        raise ValueError(f"Not a valid board ID: {board_id!r}") from None
+    if version != BOARD_ID_VERSION or len(bitmap) != (rows * cols + 7) // 8:
+        raise ValueError(f"Not a valid board ID: {board_id!r}")
+
+    board = Board(rows, cols, 0, backend=backend)
+    board.set_mine_bitmap(bitmap)
+    return board
+
+
+def neighbour_counts(mines):
+    # Adjacent mine counts for a boolean (rows, cols) mine mask, or a
+    # (boards, rows, cols) batch of them: the sum of the eight shifted copies
+    # of the zero-padded mask
+    mask = mines.astype(np.uint8)
+    rows, cols = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad)
+    counts = np.zeros_like(mask)
+    for dr in range(3):
+        for dc in range(3):
+            if dr != 1 or dc != 1:
+                counts += padded[..., dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+def count_neighbours(mines):
+    # Cell values (0-8, or MINE) for a mine mask or batch of masks
+    counts = neighbour_counts(mines)
+    counts[mines] = MINE
+    return counts
+
+
+def generate_boards(count, rows, cols, mines, rng=None):
+    # Bulk generation with the NumPy backend: returns a (count, rows, cols)
+    # uint8 array of cell values. Each row of random keys is partitioned so
+    # the smallest `mines` keys pick that board's mine positions.
+    if np is None:
+        raise RuntimeError("generate_boards requires NumPy to be installed")
+    rng = rng or np.random.default_rng()
+    cells = rows * cols
+    layout = np.zeros((count, cells), dtype=bool)
+    if mines:
+        keys = rng.random((count, cells))
+        positions = keys.argpartition(mines - 1, axis=1)[:, :mines]
+        np.put_along_axis(layout, positions, True, axis=1)
+    return count_neighbours(layout.reshape(count, rows, cols))
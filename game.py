@@ -0,0 +1,489 @@
+import functools
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import time
+
+from board_view import BoardView
+from engine import (Board, COUNT_MASK, DIFFICULTY, FLAGGED, LOST, MINE_BIT, REVEALED, WON,
+                    board_name, decode_board_id, encode_board_id, layout_board_id)
+from movelog import MoveLog, log_path
+from no_guess import LayoutSearch
+from probability import ProbabilityEngine
+from scores import format_time
+from sprites import cell_size, load_sprites
+
+# How often a pending no-guess search is checked on
+SEARCH_POLL_MS = 50
+
+def sprite_name(cell, lost):
+    # Sprite for a packed engine cell byte; a lost game also shows hidden
+    # mines and flags placed on safe cells
+    is_mine = cell & MINE_BIT
+    if cell & FLAGGED:
+        return 'wrong' if lost and not is_mine else 'flag'
+    if not cell & REVEALED:
+        return 'mine' if lost and is_mine else 'covered'
+    if is_mine:
+        return 'mine'
+    count = cell & COUNT_MASK
+    return str(count) if count else 'uncovered'
+
+# Sprite for every possible cell byte, indexed by [lost][cell]
+CELL_SPRITES = [[sprite_name(cell, lost) for cell in range(256)]
+                for lost in (False, True)]
+
+class Minesweeper:
+    def __init__(self, master, difficulty, scores, start_screen, seed=None,
+                 no_guess=False, size=None, instrumentation=None):
+        self.master = master
+        self.master.title("Minesweeper")
+        # Board size as (rows, cols, mines); difficulty names it and keys
+        # its high scores
+        if size is None:
+            settings = DIFFICULTY[difficulty]
+            size = (settings['rows'], settings['cols'], settings['mines'])
+        self.size = tuple(size)
+        self.difficulty = board_name(*self.size)
+        self.scores = scores
+        self.start_screen = start_screen
+        self.refresh_button = None
+        self.message_label = None
+        self.timer_label = None
+        self.mine_counter_label = None
+        self.timer_started = None  # perf_counter() the clock counts from
+        self.timer_running = False
+        self.timer_job = None      # the one pending display update
+        self.elapsed_ms = 0
+        self.game = None  # Will be initialized in new_game
+        self.no_guess = tk.BooleanVar(value=no_guess)
+        self.search = None  # LayoutSearch for a no-guess board's first click
+        self.show_hints = tk.BooleanVar(value=False)
+        self.hints = None  # ProbabilityEngine, created once hints are turned on
+        self.used_undo = False  # undo keeps a win off the high scores
+        self.clicks = 0
+        self.info_frame = None
+        self.board_view = None
+        # Optional Instrumentation timing the hot paths; its overlay shows
+        # what it has measured so far
+        self.instrumentation = instrumentation
+        self.show_debug = tk.BooleanVar(value=False)
+        self.debug_label = None
+        if instrumentation:
+            instrumentation.attach_game(self)
+            instrumentation.listeners.append(self.update_debug_overlay)
+        
+        # Load images
+        self.images = {}
+        self.load_images()
+        
+        # Stop the clock and close the move log however the window goes
+        self.master.bind('<Destroy>', self.handle_destroy)
+        
+        # Create game layout
+        self.create_menu()
+        self.create_info_frame()
+        self.create_board_view()
+        self.new_game(seed=seed)
+        
+        # Configure window; large boards scroll inside it
+        self.master.resizable(True, True)
+        self.master.rowconfigure(1, weight=1)
+        self.master.columnconfigure(0, weight=1)
+        self.master.update_idletasks()
+        
+        # Center the window
+        width = self.master.winfo_width()
+        height = self.master.winfo_height()
+        x = (self.master.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.master.winfo_screenheight() // 2) - (height // 2)
+        self.master.geometry(f'+{x}+{y}')
+        
+        # Ensure window is visible and focused
+        self.master.lift()
+        self.master.focus_force()
+
+    def add_high_score(self, time_ms, on_saved):
+        # Saved in the background; on_saved(rank) runs once it is stored.
+        # Only the mine bitmap is copied here; the board ID is encoded on
+        # the writer thread, as it takes a while on large boards.
+        game = self.game
+        board_id = functools.partial(layout_board_id, game.rows, game.cols, game.mine_bitmap())
+        self.scores.add(self.difficulty, time_ms, board_id=board_id,
+                        clicks=self.clicks, on_saved=on_saved)
+
+    def show_high_scores(self):
+        self.scores.show(self.master, self.difficulty)
+
+    def create_menu(self):
+        menubar = tk.Menu(self.master)
+        self.master.config(menu=menubar)
+        
+        game_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Game", menu=game_menu)
+        game_menu.add_command(label="New Game", command=self.new_game)
+        game_menu.add_checkbutton(label="No-Guess Boards", variable=self.no_guess,
+                                  command=self.new_game)
+        game_menu.add_checkbutton(label="Show Mine Probabilities", variable=self.show_hints,
+                                  command=self.update_hints)
+        game_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        game_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        self.master.bind('<Control-z>', lambda event: self.undo())
+        self.master.bind('<Control-y>', lambda event: self.redo())
+        self.master.bind('<Control-Z>', lambda event: self.redo())
+        game_menu.add_command(label="Restart This Board", command=self.restart_board)
+        game_menu.add_command(label="Copy Board ID", command=self.copy_board_id)
+        game_menu.add_command(label="Play Board ID...", command=self.play_board_id)
+        game_menu.add_command(label="High Scores", command=self.show_high_scores)
+        if self.instrumentation:
+            game_menu.add_checkbutton(label="Show Debug Overlay", variable=self.show_debug,
+                                      command=self.update_debug_overlay)
+            game_menu.add_command(label="Export Timings...", command=self.export_timings)
+            if self.instrumentation.profiler is not None:
+                game_menu.add_command(label="Export Profile...", command=self.export_profile)
+        game_menu.add_command(label="Return to Menu", command=self.return_to_menu)
+        game_menu.add_separator()
+        
+        difficulty_menu = tk.Menu(game_menu, tearoff=0)
+        game_menu.add_cascade(label="Difficulty", menu=difficulty_menu)
+        for diff in DIFFICULTY.keys():
+            difficulty_menu.add_command(label=diff, 
+                                      command=lambda d=diff: self.change_difficulty(d))
+        
+        game_menu.add_separator()
+        game_menu.add_command(label="Exit", 
+                            command=lambda: self.quit_game())
+    
+    def create_info_frame(self):
+        self.info_frame = tk.Frame(self.master)
+        self.info_frame.grid(row=0, column=0, sticky='ew', pady=5)
+        
+        self.mine_counter_label = tk.Label(self.info_frame, text=f"Mines: {self.size[2]}", 
+                                          font=("Arial", 12))
+        self.mine_counter_label.pack(side=tk.LEFT, padx=10)
+        
+        self.timer_label = tk.Label(self.info_frame, text="Time: 00:00", font=("Arial", 12))
+        self.timer_label.pack(side=tk.RIGHT, padx=10)
+    
+    def start_timer(self):
+        # Counts on from elapsed_ms, so a game undone out of its finish
+        # resumes where it stopped
+        self.timer_started = time.perf_counter() - self.elapsed_ms / 1000
+        self.timer_running = True
+        self.update_timer()
+
+    def stop_timer(self):
+        # Freezes elapsed_ms at this instant and cancels the pending update
+        if self.timer_running:
+            self.elapsed_ms = int((time.perf_counter() - self.timer_started) * 1000)
+            self.timer_running = False
+        if self.timer_job is not None:
+            self.master.after_cancel(self.timer_job)
+            self.timer_job = None
+
+    def update_timer(self):
+        # The clock is perf_counter, so the display never drifts however late
+        # a callback runs; each update is timed to land just after the next
+        # whole second
+        elapsed = int((time.perf_counter() - self.timer_started) * 1000)
+        self.timer_label.config(text=f"Time: {format_time(elapsed)}")
+        self.timer_job = self.master.after(1001 - elapsed % 1000, self.update_timer)
+    
+    def change_difficulty(self, difficulty):
+        settings = DIFFICULTY[difficulty]
+        self.size = (settings['rows'], settings['cols'], settings['mines'])
+        self.difficulty = difficulty
+        self.master.title(f"Minesweeper - {difficulty}")
+        self.new_game()
+        
+    def quit_game(self):
+        if messagebox.askokcancel("Quit", "Do you want to exit Minesweeper?"):
+            if self.start_screen:
+                self.start_screen.master.destroy()
+            else:
+                self.master.destroy()
+
+    def return_to_menu(self):
+        self.master.destroy()
+        if self.start_screen:
+            self.start_screen.master.deiconify()
+
+    def handle_destroy(self, event):
+        # <Destroy> reaches the toplevel for each of its children too
+        if event.widget is self.master:
+            self.stop_timer()
+            self.cancel_search()
+            self.close_log()
+            if self.instrumentation:
+                self.instrumentation.listeners.remove(self.update_debug_overlay)
+    
+    def new_game(self, seed=None, board=None):
+        # Update window title
+        self.master.title(f"Minesweeper - {self.difficulty}")
+        
+        # Initialize game state
+        if board is None:
+            board = Board(*self.size, seed=seed, no_guess=self.no_guess.get())
+        self.cancel_search()
+        self.close_log()
+        board.log = MoveLog(log_path(board))
+        board.history = []
+        if self.instrumentation:
+            self.instrumentation.attach_board(board)
+        self.used_undo = False
+        self.clicks = 0
+        self.game = board
+        self.hints = None
+        self.stop_timer()
+        self.timer_started = None
+        self.elapsed_ms = 0
+        
+        # Reuse the canvas; only a size change recreates its cell items. A
+        # new size also drops any size the window was dragged to.
+        if (board.rows, board.cols) != (self.board_view.rows, self.board_view.cols):
+            self.master.geometry('')
+        self.board_view.reset(self.game.rows, self.game.cols)
+        
+        # Update display
+        self.mine_counter_label.config(text=f"Mines: {self.game.mines_left}")
+        self.timer_label.config(text=f"Time: {format_time(0)}")
+        
+        # Update window size and position
+        self.master.update_idletasks()
+        width = self.master.winfo_width()
+        height = self.master.winfo_height()
+        x = (self.master.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.master.winfo_screenheight() // 2) - (height // 2)
+        self.master.geometry(f'+{x}+{y}')
+
+    def close_log(self):
+        if self.game is not None and self.game.log is not None:
+            self.game.log.close()
+
+    def restart_board(self):
+        # Replay the current layout, or the same seed if no cell is open yet
+        if self.game.generated:
+            self.new_game(board=decode_board_id(encode_board_id(self.game)))
+        else:
+            self.new_game(seed=self.game.seed)
+
+    def copy_board_id(self):
+        if not self.game.generated:
+            messagebox.showinfo("Board ID", "Mines are placed on your first click. "
+                                "Reveal a cell, then copy the board ID.")
+            return
+        self.master.clipboard_clear()
+        self.master.clipboard_append(encode_board_id(self.game))
+
+    def play_board_id(self):
+        board_id = simpledialog.askstring("Play Board ID", "Board ID:", parent=self.master)
+        if not board_id:
+            return
+        try:
+            board = decode_board_id(board_id.strip())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.size = (board.rows, board.cols, board.mines)
+        self.difficulty = board_name(*self.size)
+        self.new_game(board=board)
+
+    def load_images(self):
+        # The sprites are decoded once per process and shared by every game
+        # window
+        try:
+            self.images = load_sprites(self.master, cell_size(self.master))
+        except (tk.TclError, OSError) as e:
+            print(f"Error loading images: {e}")
+            messagebox.showerror("Error", "Failed to load game images. Using text mode.")
+    
+    def create_board_view(self):
+        board_frame = tk.Frame(self.master)
+        board_frame.grid(row=1, column=0, sticky='nsew')
+        board_frame.rowconfigure(0, weight=1)
+        board_frame.columnconfigure(0, weight=1)
+        self.board_view = BoardView(board_frame, self.images,
+                                    image_for=self.cell_image,
+                                    on_reveal=self.reveal_cell,
+                                    on_flag=self.toggle_flag,
+                                    on_chord=self.chord_cell)
+        self.board_view.grid(row=0, column=0, sticky='nsew')
+        xscrollbar = ttk.Scrollbar(board_frame, orient='horizontal')
+        xscrollbar.grid(row=1, column=0, sticky='ew')
+        yscrollbar = ttk.Scrollbar(board_frame, orient='vertical')
+        yscrollbar.grid(row=0, column=1, sticky='ns')
+        self.board_view.set_scrollbars(xscrollbar, yscrollbar)
+        if self.instrumentation:
+            self.instrumentation.attach_view(self.board_view)
+            self.debug_label = tk.Label(board_frame, justify=tk.LEFT, anchor='nw',
+                                        font=("Courier", 9), bg='#ffffe0')
+
+    def update_debug_overlay(self):
+        if not self.show_debug.get():
+            self.debug_label.place_forget()
+            return
+        self.debug_label.config(text=self.instrumentation.summary() or "No clicks timed yet")
+        self.debug_label.place(in_=self.board_view, x=4, y=4)
+
+    def export_timings(self):
+        path = filedialog.asksaveasfilename(parent=self.master, defaultextension='.json',
+                                            filetypes=[("JSON", '*.json')])
+        if path:
+            try:
+                self.instrumentation.export_json(path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not export timings: {e}")
+
+    def export_profile(self):
+        path = filedialog.asksaveasfilename(parent=self.master, defaultextension='.prof',
+                                            filetypes=[("pstats", '*.prof')])
+        if path:
+            try:
+                self.instrumentation.export_profile(path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not export profile: {e}")
+
+    def toggle_flag(self, row, col):
+        if self.search is not None:
+            return
+        self.clicks += 1
+        changed = self.game.toggle_flag(row, col)
+        if not changed:
+            return
+        
+        self.board_view.mark_dirty(changed)
+        self.update_hints(changed)
+        
+        self.mine_counter_label.config(text=f"Mines: {self.game.mines_left}")
+        
+    def reveal_cell(self, row, col):
+        if self.search is not None:
+            return
+        self.clicks += 1
+        if self.game.is_revealed(row, col):
+            # Clicking an open number chords it
+            self.apply_move(self.game.chord(row, col))
+            return
+        if self.game.no_guess and not self.game.generated and not self.game.is_flagged(row, col):
+            self.start_search(row, col)
+            return
+        self.apply_move(self.game.reveal(row, col))
+
+    def chord_cell(self, row, col):
+        if self.search is not None:
+            return
+        self.clicks += 1
+        self.apply_move(self.game.chord(row, col))
+
+    def start_search(self, row, col):
+        # The solver hunts for a no-guess layout in other processes while
+        # the window stays responsive; the click lands once it is found
+        game = self.game
+        self.search = LayoutSearch(game.rows, game.cols, game.mines, game.index(row, col),
+                                   game.seed, safe_neighbours=game.safe_neighbours)
+        self.board_view.show_banner("Generating", "Building a board that needs no guessing...",
+                                    closes=False)
+        self.master.after(SEARCH_POLL_MS, self.poll_search, self.search, row, col)
+
+    def poll_search(self, search, row, col):
+        if search is not self.search:
+            return  # cancelled by a new game or the window closing
+        if not search.done():
+            self.master.after(SEARCH_POLL_MS, self.poll_search, search, row, col)
+            return
+        self.search = None
+        self.board_view.clear_banner()
+        game = self.game
+        if search.result is None:
+            # Out of time: play an ordinary layout rather than keep waiting
+            game.no_guess = False
+        game.generate(game.index(row, col), positions=search.result)
+        self.apply_move(game.reveal(row, col))
+        if search.result is None and not game.game_over:
+            self.board_view.show_banner("No-guess board not found",
+                                        "This board is an ordinary one and may need a guess.")
+
+    def cancel_search(self):
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+
+    def apply_move(self, changed):
+        if not changed:
+            return
+        
+        if self.timer_started is None:
+            self.start_timer()
+        
+        self.board_view.mark_dirty(changed)
+        self.update_hints(changed)
+        if self.game.game_over:
+            self.show_result()
+
+    def show_result(self):
+        # The board is already frozen by the engine's state, so the result
+        # goes up as an overlay and the click returns straight away; a win
+        # is saved off the Tk thread and its rank filled in when it lands
+        self.stop_timer()
+        self.timer_label.config(text=f"Time: {format_time(self.elapsed_ms)}")
+        if self.game.state == LOST:
+            self.board_view.show_banner("Game Over", "Better luck next time!")
+            return
+        won = f"You've won the game in {format_time(self.elapsed_ms, millis=True)}!"
+        if self.used_undo:
+            self.board_view.show_banner("Congratulations!", f"{won}\nUndo was used, so this time is not recorded.")
+            return
+        self.board_view.show_banner("Congratulations!", won)
+        game = self.game
+
+        def on_saved(rank):
+            if (self.game is not game or self.game.state != WON
+                    or not self.board_view.winfo_exists()):
+                return  # a new game started, the win was undone, or the window closed
+            if rank is None:
+                self.board_view.show_banner("Congratulations!", f"{won}\nYour time could not be saved.")
+            else:
+                self.board_view.show_banner("Congratulations!", f"{won}\nThat's #{rank} on the {self.difficulty} leaderboard!")
+
+        self.add_high_score(self.elapsed_ms, on_saved)
+
+    def undo(self):
+        changed = self.game.undo()
+        if changed:
+            self.used_undo = True
+            self.apply_history(changed)
+
+    def redo(self):
+        self.apply_history(self.game.redo())
+
+    def apply_history(self, changed):
+        if not changed:
+            return
+        self.board_view.mark_dirty(changed)
+        self.mine_counter_label.config(text=f"Mines: {self.game.mines_left}")
+        if self.game.game_over:
+            self.show_result()
+        else:
+            self.board_view.clear_banner()
+        # The probability engine only follows moves forward; start it afresh
+        self.hints = None
+        self.update_hints()
+        if not self.game.game_over and self.timer_started is not None and not self.timer_running:
+            # Undoing the last move of a finished game plays on
+            self.start_timer()
+
+    def update_hints(self, changed=()):
+        # Keep the probability engine in step with every move, and redraw the
+        # overlay while it is switched on
+        if self.hints is not None:
+            self.hints.update(changed)
+        if not self.show_hints.get() or self.game.game_over or not self.game.generated:
+            self.board_view.clear_hints()
+            return
+        if self.hints is None:
+            self.hints = ProbabilityEngine(self.game)
+        cells = self.game.cells
+        self.board_view.show_hints({index: p for index, p in self.hints.probabilities().items()
+                                    if not cells[index] & FLAGGED})
+
+    def cell_image(self, index):
+        return CELL_SPRITES[self.game.state == LOST][self.game.cells[index]]
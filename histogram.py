@@ -0,0 +1,58 @@
+import math
+
+# Buckets per factor of ten; 20 keeps every bucket within about 12% of the
+# values it holds
+BUCKETS_PER_DECADE = 20
+
+
+class LatencyHistogram:
+    # Log-bucketed latency histogram in nanoseconds. Memory stays constant
+    # however many samples are added, and histograms from different processes
+    # merge exactly, so percentiles can be computed over millions of calls.
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        bucket = int(math.log10(ns) * BUCKETS_PER_DECADE) if ns > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, p):
+        # Upper edge of the bucket holding the p-th percentile, capped at the
+        # largest sample seen
+        if not self.count:
+            return 0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(10 ** ((bucket + 1) / BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ns': self.mean,
+            'p50_ns': self.percentile(50),
+            'p90_ns': self.percentile(90),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max,
+        }
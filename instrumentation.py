@@ -0,0 +1,178 @@
+import cProfile
+import functools
+import json
+import time
+
+from histogram import LatencyHistogram
+
+# Engine methods timed on every board, with a function giving the number of
+# cells each call touched (None for methods that only report time)
+BOARD_METHODS = {
+    'reveal': len,
+    'toggle_flag': len,
+    'chord': len,
+    'flood_fill': len,
+    'place_mines': None,
+    'calculate_numbers': None,
+    'check_win': None,
+}
+# Minesweeper handlers, timed from the click until the handler returns
+HANDLERS = ('reveal_cell', 'toggle_flag', 'chord_cell', 'new_game')
+
+
+class Counter:
+    # Sum, count and largest of a per-call quantity, such as cells touched
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0,
+            'max': self.max,
+        }
+
+
+class Instrumentation:
+    # Opt-in timing of the game's hot paths. Methods are wrapped on the
+    # instances being watched, by shadowing them with an instance attribute,
+    # so nothing is wrapped, and nothing costs anything, unless an
+    # Instrumentation is attached. Latencies go into LatencyHistograms under
+    # 'Class.method' names; per-call quantities (cells touched, canvas items
+    # reconfigured) into Counters.
+    #
+    # A click starts an interaction that ends once the board view has
+    # flushed its changes and Tk has redrawn the canvas, which is recorded
+    # as 'click_to_paint'.
+    def __init__(self, profile=False):
+        self.latency = {}
+        self.counts = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self.profiling = False
+        self.click_started = None
+        self.last_paint_ns = None
+        self.listeners = []  # called with no arguments after each paint
+
+    def histogram(self, name):
+        if name not in self.latency:
+            self.latency[name] = LatencyHistogram()
+        return self.latency[name]
+
+    def counter(self, name):
+        if name not in self.counts:
+            self.counts[name] = Counter()
+        return self.counts[name]
+
+    def wrap(self, obj, method, touched=None, starts_click=False):
+        # Time obj.method from now on; touched(result) gives the cells the
+        # call touched
+        original = getattr(obj, method)
+        name = f'{type(obj).__name__}.{method}'
+        latency = self.histogram(name)
+        cells = self.counter(f'{name}.cells') if touched else None
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            if starts_click:
+                # A click that changes nothing never paints; the next one
+                # starts the measurement afresh
+                self.click_started = start
+            result = original(*args, **kwargs)
+            latency.add(time.perf_counter_ns() - start)
+            if cells is not None:
+                cells.add(touched(result))
+            return result
+
+        setattr(obj, method, timed)
+
+    def attach_board(self, board):
+        for method, touched in BOARD_METHODS.items():
+            self.wrap(board, method, touched)
+
+    def attach_game(self, game):
+        # Before the board view is created, so its callbacks are the wrapped
+        # handlers
+        for method in HANDLERS:
+            self.wrap(game, method, starts_click=method != 'new_game')
+
+    def attach_view(self, view):
+        self.wrap(view, 'update_viewport')
+        flush = view.flush
+        latency = self.histogram('BoardView.flush')
+        draw_ops = self.counter('BoardView.draw_ops')
+
+        @functools.wraps(flush)
+        def timed_flush():
+            start = time.perf_counter_ns()
+            flush()
+            latency.add(time.perf_counter_ns() - start)
+            draw_ops.add(view.last_draw_ops)
+            if self.click_started is not None:
+                # Tk redraws the canvas in an idle callback queued by the
+                # flush; one queued now runs after it
+                view.after_idle(self.painted)
+
+        view.flush = timed_flush
+
+    def painted(self):
+        if self.click_started is None:
+            return
+        self.last_paint_ns = time.perf_counter_ns() - self.click_started
+        self.histogram('click_to_paint').add(self.last_paint_ns)
+        self.click_started = None
+        for listener in self.listeners:
+            listener()
+
+    def start_profile(self):
+        if self.profiler is not None:
+            self.profiler.enable()
+            self.profiling = True
+
+    def stop_profile(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiling = False
+
+    def to_dict(self):
+        return {
+            'latency': {name: h.to_dict() for name, h in sorted(self.latency.items())},
+            'counts': {name: c.to_dict() for name, c in sorted(self.counts.items())},
+        }
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def export_profile(self, path):
+        # A pstats dump, readable with pstats.Stats(path) or snakeviz
+        if self.profiler is None:
+            raise ValueError("Profiling was not turned on")
+        # Dumping stops the profiler; carry on profiling after a mid-game export
+        self.profiler.dump_stats(path)
+        if self.profiling:
+            self.profiler.enable()
+
+    def summary(self):
+        # A few lines for the debug overlay
+        lines = []
+        if self.last_paint_ns is not None:
+            lines.append(f"last click to paint {self.last_paint_ns / 1e6:.1f} ms")
+        for name in ('click_to_paint', 'Minesweeper.reveal_cell', 'Board.flood_fill',
+                     'BoardView.flush'):
+            h = self.latency.get(name)
+            if h is not None and h.count:
+                lines.append(f"{name} p50 {h.percentile(50) / 1e6:.2f} "
+                             f"p99 {h.percentile(99) / 1e6:.2f} ms ({h.count})")
+        ops = self.counts.get('BoardView.draw_ops')
+        if ops is not None and ops.count:
+            lines.append(f"draw ops/flush mean {ops.to_dict()['mean']:.0f} max {ops.max}")
+        return '\n'.join(lines)
@@ -0,0 +1,204 @@
+import queue
+import tkinter as tk
+from tkinter import ttk
+
+from presets import DIFFICULTY
+from scores import MAX_SCORES, ScoreWriter, format_time
+
+# How often to check for saved scores while any are being written, in ms
+POLL_MS = 50
+
+
+class ScoresService:
+    # The single owner of the high-score window, shared by the start screen
+    # and every game window. Leaderboard pages are read from the store a page
+    # at a time, formatted once and cached. A new score only drops the cached
+    # pages at or below its rank, and updates the window in place if it is
+    # open, so opening the leaderboard never rebuilds or re-sorts anything.
+    #
+    # New scores are written by a ScoreWriter thread, started on the first
+    # win; master polls for the results, so the Tk thread never waits on
+    # the disk. The store is only read here.
+    def __init__(self, store, master, page_size=MAX_SCORES):
+        self.store = store
+        self.master = master
+        self.page_size = page_size
+        self.writer = None
+        self.pending = 0
+        self.poll_job = None
+        self.pages = {}    # (board_key, page) -> formatted lines
+        self.counts = {}   # board_key -> number of scores
+        self.window = None
+        self.notebook = None
+        self.tabs = {}     # board_key -> LeaderboardTab in the open window
+
+    def count(self, board_key):
+        if board_key not in self.counts:
+            self.counts[board_key] = self.store.count(board_key)
+        return self.counts[board_key]
+
+    def page_count(self, board_key):
+        return max(1, -(-self.count(board_key) // self.page_size))
+
+    def page(self, board_key, number):
+        # Formatted lines for one page, numbered from 0
+        key = (board_key, number)
+        if key not in self.pages:
+            offset = number * self.page_size
+            lines = []
+            rank = previous = None
+            for position, row in enumerate(self.store.top(board_key, self.page_size, offset),
+                                           offset + 1):
+                # Equal times share a rank, as in ScoreStore.rank, which the
+                # win banner quotes; a tie can run in from the page before
+                if rank is None:
+                    rank = self.store.rank(board_key, row['time_ms'])
+                elif row['time_ms'] != previous:
+                    rank = position
+                previous = row['time_ms']
+                lines.append(f"{rank}. {format_time(row['time_ms'], millis=True)}"
+                             + (f"   {row['played_at'][:10]}" if row['played_at'] else ''))
+            self.pages[key] = lines
+        return self.pages[key]
+
+    def personal_best(self, board_key):
+        return self.store.personal_best(board_key)
+
+    def add(self, board_key, time_ms, board_id=None, clicks=None, on_saved=None):
+        # Record a win in the background. on_saved(rank) is called on the Tk
+        # thread once it is stored, with None if it could not be saved.
+        if self.writer is None:
+            self.writer = ScoreWriter(self.store.path)
+        self.writer.add(board_key, time_ms, board_id=board_id, clicks=clicks, token=on_saved)
+        self.pending += 1
+        if self.poll_job is None:
+            self.poll_job = self.master.after(POLL_MS, self.poll)
+
+    def poll(self):
+        self.poll_job = None
+        while True:
+            try:
+                on_saved, board_key, rank, error = self.writer.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if error is not None:
+                print(f"Error saving high scores: {error}")
+            else:
+                self.saved(board_key, rank)
+            if on_saved is not None:
+                on_saved(rank)
+        if self.pending:
+            self.poll_job = self.master.after(POLL_MS, self.poll)
+
+    def saved(self, board_key, rank):
+        first_page = (rank - 1) // self.page_size
+        for key in [key for key in self.pages if key[0] == board_key and key[1] >= first_page]:
+            del self.pages[key]
+        if board_key in self.counts:
+            self.counts[board_key] += 1
+        if self.window is not None:
+            if board_key not in self.tabs:
+                self.add_tab(board_key)
+            self.tabs[board_key].refresh()
+
+    def close(self):
+        # Wait for any scores still being written
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def board_keys(self):
+        # The presets first, then every custom size that has scores
+        return list(DIFFICULTY) + [key for key in self.store.board_keys() if key not in DIFFICULTY]
+
+    def show(self, parent, board_key=None):
+        # Open the leaderboard over parent, or bring the open one forward
+        if self.window is None:
+            self.build_window(parent)
+        if board_key in self.tabs:
+            self.notebook.select(self.tabs[board_key])
+
+        window = self.window
+        window.update_idletasks()
+        width = window.winfo_width()
+        height = window.winfo_height()
+        x = (parent.winfo_rootx() + (parent.winfo_width() // 2) - (width // 2))
+        y = (parent.winfo_rooty() + (parent.winfo_height() // 2) - (height // 2))
+        window.geometry(f'+{x}+{y}')
+        window.deiconify()
+        window.lift()
+        window.focus_force()
+
+    def build_window(self, parent):
+        # Closing only hides the window; if its parent is destroyed the next
+        # show() builds it again
+        window = tk.Toplevel(parent)
+        window.title("High Scores")
+        window.geometry("340x460")
+        window.resizable(False, False)
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
+        window.bind('<Destroy>', self.forget_window)
+        self.window = window
+
+        style = ttk.Style()
+        style.configure('Scores.TNotebook', background='#f0f0f0')
+        style.configure('Scores.TFrame', background='#f0f0f0')
+
+        self.notebook = ttk.Notebook(window, style='Scores.TNotebook')
+        self.notebook.pack(padx=10, pady=10, expand=True, fill='both')
+        self.tabs = {}
+        for board_key in self.board_keys():
+            self.add_tab(board_key)
+
+        ttk.Button(window, text="Close", command=window.withdraw).pack(pady=10)
+
+    def add_tab(self, board_key):
+        tab = LeaderboardTab(self.notebook, self, board_key)
+        self.notebook.add(tab, text=board_key)
+        self.tabs[board_key] = tab
+
+    def forget_window(self, event):
+        if event.widget is self.window:
+            self.window = self.notebook = None
+            self.tabs = {}
+
+
+class LeaderboardTab(ttk.Frame):
+    # One board's leaderboard: a fixed set of row labels whose text is
+    # swapped when paging or when a score arrives
+    def __init__(self, master, service, board_key):
+        super().__init__(master, style='Scores.TFrame', padding=10)
+        self.service = service
+        self.board_key = board_key
+        self.number = 0
+
+        self.rows = [ttk.Label(self, font=("Arial", 11)) for _ in range(service.page_size)]
+        for label in self.rows:
+            label.pack(pady=2)
+
+        nav = ttk.Frame(self, style='Scores.TFrame')
+        nav.pack(side=tk.BOTTOM, fill='x', pady=(10, 0))
+        self.previous_button = ttk.Button(nav, text="<", width=3,
+                                          command=lambda: self.turn(-1))
+        self.previous_button.pack(side=tk.LEFT)
+        self.next_button = ttk.Button(nav, text=">", width=3, command=lambda: self.turn(1))
+        self.next_button.pack(side=tk.RIGHT)
+        self.page_label = ttk.Label(nav, font=("Arial", 10))
+        self.page_label.pack()
+        self.refresh()
+
+    def turn(self, step):
+        self.number = min(max(self.number + step, 0), self.service.page_count(self.board_key) - 1)
+        self.refresh()
+
+    def refresh(self):
+        lines = self.service.page(self.board_key, self.number)
+        if not lines and self.number == 0:
+            lines = ["No scores yet!"]
+        for label, text in zip(self.rows, lines + [''] * len(self.rows)):
+            label.config(text=text)
+        pages = self.service.page_count(self.board_key)
+        self.page_label.config(text=f"Page {self.number + 1} of {pages}")
+        self.previous_button.config(state='normal' if self.number > 0 else 'disabled')
+        self.next_button.config(state='normal' if self.number < pages - 1 else 'disabled')
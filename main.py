@@ -1,385 +1,44 @@
+import time
+STARTED = time.perf_counter()  # launch time for --timing, taken before the other imports
+
 import tkinter as tk
 from tkinter import messagebox, ttk
-import random
-from datetime import datetime
-import json
-import os
-
-DIFFICULTY = {
-    'Beginner': {'rows': 9, 'cols': 9, 'mines': 10},
-    'Intermediate': {'rows': 16, 'cols': 16, 'mines': 40},
-    'Expert': {'rows': 16, 'cols': 30, 'mines': 99}
-}
-
-class Minesweeper:
-    def __init__(self, master, difficulty, high_scores, start_screen):
-        self.master = master
-        self.master.title("Minesweeper")
-        self.difficulty = difficulty
-        self.high_scores = high_scores
-        self.start_screen = start_screen
-        self.refresh_button = None
-        self.message_label = None
-        self.timer_label = None
-        self.mine_counter_label = None
-        self.start_time = None
-        self.timer_running = False
-        self.elapsed_time = 0
-        self.game_over = False
-        self.board = None
-        self.buttons = {}
-        self.revealed = None  # Will be initialized in new_game
-        self.flagged = None   # Will be initialized in new_game
-        self.flags_placed = 0
-        self.info_frame = None
-        self.button_frame = None
-        
-        # Load images
-        self.images = {}
-        self.load_images()
-        
-        # Create game layout
-        self.create_menu()
-        self.create_info_frame()
-        self.new_game()
-        
-        # Configure window
-        self.master.resizable(False, False)
-        self.master.update_idletasks()
-        
-        # Center the window
-        width = self.master.winfo_width()
-        height = self.master.winfo_height()
-        x = (self.master.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.master.winfo_screenheight() // 2) - (height // 2)
-        self.master.geometry(f'+{x}+{y}')
-        
-        # Ensure window is visible and focused
-        self.master.lift()
-        self.master.focus_force()
-
-    def add_high_score(self, time):
-        if self.difficulty not in self.high_scores:
-            self.high_scores[self.difficulty] = []
-        scores = self.high_scores[self.difficulty]
-        scores.append(time)
-        scores.sort()
-        self.high_scores[self.difficulty] = scores[:10]  # Keep only top 10
-        self.save_high_scores()
-        
-    def save_high_scores(self):
-        try:
-            with open('highscores.json', 'w') as f:
-                json.dump(self.high_scores, f)
-        except Exception as e:
-            print(f"Error saving high scores: {e}")
+import argparse
 
-    def format_time(self, seconds):
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:02d}"
+from leaderboard import ScoresService
+from presets import DIFFICULTY
+from scores import ScoreStore
 
-    def show_high_scores(self):
-        # Get the parent window (either game window or start screen)
-        parent = self.master
-        
-        scores_window = tk.Toplevel(parent)
-        scores_window.title("High Scores")
-        scores_window.transient(parent)
-        scores_window.grab_set()
-        scores_window.geometry("300x400")
-        scores_window.resizable(False, False)
-
-        # Style configuration
-        style = ttk.Style()
-        style.configure('Scores.TNotebook', background='#f0f0f0')
-        style.configure('Scores.TFrame', background='#f0f0f0')
+# Start screen choice for a board size of your own
+CUSTOM = 'Custom'
 
-        notebook = ttk.Notebook(scores_window, style='Scores.TNotebook')
-        notebook.pack(padx=10, pady=10, expand=True, fill='both')
 
-        for difficulty in DIFFICULTY.keys():
-            frame = ttk.Frame(notebook, style='Scores.TFrame')
-            notebook.add(frame, text=difficulty)
-            frame.configure(padding=10)
-
-            scores = self.high_scores.get(difficulty, [])
-            if not scores:
-                ttk.Label(frame, text="No scores yet!", 
-                         font=("Arial", 11)).pack(pady=20)
-            else:
-                # Sort scores and take top 10
-                sorted_scores = sorted(scores)[:10]
-                for i, score in enumerate(sorted_scores, 1):
-                    formatted_time = self.format_time(score)
-                    ttk.Label(frame, text=f"{i}. {formatted_time}", 
-                             font=("Arial", 11)).pack(pady=2)
-
-        close_button = ttk.Button(scores_window, text="Close", 
-                                 command=scores_window.destroy)
-        close_button.pack(pady=10)
-
-        # Center the scores window
-        scores_window.update_idletasks()
-        width = scores_window.winfo_width()
-        height = scores_window.winfo_height()
-        x = (parent.winfo_rootx() + (parent.winfo_width() // 2) - (width // 2))
-        y = (parent.winfo_rooty() + (parent.winfo_height() // 2) - (height // 2))
-        scores_window.geometry(f'+{x}+{y}')
-        
-        # Ensure the window is visible and focused
-        scores_window.lift()
-        scores_window.focus_force()
-
-    def create_menu(self):
-        menubar = tk.Menu(self.master)
-        self.master.config(menu=menubar)
-        
-        game_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Game", menu=game_menu)
-        game_menu.add_command(label="New Game", command=self.new_game)
-        game_menu.add_command(label="High Scores", command=self.show_high_scores)
-        game_menu.add_command(label="Return to Menu", 
-                            command=lambda: self.master.destroy())
-        game_menu.add_separator()
-        
-        difficulty_menu = tk.Menu(game_menu, tearoff=0)
-        game_menu.add_cascade(label="Difficulty", menu=difficulty_menu)
-        for diff in DIFFICULTY.keys():
-            difficulty_menu.add_command(label=diff, 
-                                      command=lambda d=diff: self.change_difficulty(d))
-        
-        game_menu.add_separator()
-        game_menu.add_command(label="Exit", 
-                            command=lambda: self.quit_game())
-    
-    def create_info_frame(self):
-        self.info_frame = tk.Frame(self.master)
-        self.info_frame.grid(row=0, column=0, columnspan=DIFFICULTY[self.difficulty]['cols'], sticky='ew', pady=5)
-        
-        self.mine_counter_label = tk.Label(self.info_frame, text=f"Mines: {DIFFICULTY[self.difficulty]['mines']}", 
-                                          font=("Arial", 12))
-        self.mine_counter_label.pack(side=tk.LEFT, padx=10)
-        
-        self.timer_label = tk.Label(self.info_frame, text="Time: 00:00", font=("Arial", 12))
-        self.timer_label.pack(side=tk.RIGHT, padx=10)
-    
-    def update_timer(self):
-        if self.timer_running and not self.game_over:
-            try:
-                self.elapsed_time = int((datetime.now() - self.start_time).total_seconds())
-                self.timer_label.config(text=f"Time: {self.format_time(self.elapsed_time)}")
-                self.master.after(1000, self.update_timer)
-            except:
-                self.timer_running = False
-    
-    def change_difficulty(self, difficulty):
-        self.difficulty = difficulty
-        if self.timer_running:
-            self.timer_running = False
-        self.master.title(f"Minesweeper - {difficulty}")
-        self.new_game()
-        
-    def quit_game(self):
-        if messagebox.askokcancel("Quit", "Do you want to exit Minesweeper?"):
-            if self.start_screen:
-                self.start_screen.master.destroy()
-            else:
-                self.master.destroy()
-    
-    def new_game(self):
-        rows = DIFFICULTY[self.difficulty]['rows']
-        cols = DIFFICULTY[self.difficulty]['cols']
-        
-        # Update window title
-        self.master.title(f"Minesweeper - {self.difficulty}")
-        
-        # Initialize game state
-        self.board = self.initialize_board()
-        self.buttons = {}
-        self.revealed = [[False for _ in range(cols)] for _ in range(rows)]
-        self.flagged = [[False for _ in range(cols)] for _ in range(rows)]
-        self.game_over = False
-        self.flags_placed = 0
-        self.start_time = None
-        self.timer_running = False
-        self.elapsed_time = 0
-        
-        # Clear existing game grid
-        if self.button_frame:
-            self.button_frame.destroy()
-        if self.info_frame:
-            self.info_frame.destroy()
-        
-        # Create new game layout
-        self.create_info_frame()
-        self.create_buttons()
-        self.place_mines()
-        self.calculate_numbers()
-        
-        # Update display
-        self.mine_counter_label.config(text=f"Mines: {DIFFICULTY[self.difficulty]['mines'] - self.flags_placed}")
-        self.timer_label.config(text="Time: 00:00")
-        
-        # Update window size and position
-        self.master.update_idletasks()
-        width = self.master.winfo_width()
-        height = self.master.winfo_height()
-        x = (self.master.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.master.winfo_screenheight() // 2) - (height // 2)
-        self.master.geometry(f'+{x}+{y}')
-
-    def initialize_board(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        return [[' ' for _ in range(cols)] for _ in range(rows)]
-    
-    def place_mines(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        mines = DIFFICULTY[self.difficulty]['mines']
-        mines_placed = 0
-        while mines_placed < mines:
-            row = random.randint(0, rows - 1)
-            col = random.randint(0, cols - 1)
-            if self.board[row][col] != '*':
-                self.board[row][col] = '*'
-                mines_placed += 1
-
-    def calculate_numbers(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        for row in range(rows):
-            for col in range(cols):
-                if self.board[row][col] == '*':
-                    continue
-                mine_count = 0
-                for r in range(row - 1, row + 2):
-                    for c in range(col - 1, col + 2):
-                        if 0 <= r < rows and 0 <= c < cols and self.board[r][c] == '*':
-                            mine_count += 1
-                if mine_count > 0:
-                    self.board[row][col] = str(mine_count)
-    
-    def load_images(self):
-        # Load all game images
-        try:
-            self.images['covered'] = tk.PhotoImage(file='assets/cell_covered.gif')
-            self.images['uncovered'] = tk.PhotoImage(file='assets/cell_uncovered.gif')
-            self.images['mine'] = tk.PhotoImage(file='assets/mine.gif')
-            self.images['flag'] = tk.PhotoImage(file='assets/flag.gif')
-            self.images['wrong'] = tk.PhotoImage(file='assets/wrong_mine.gif')
-            
-            # Load number images
-            for i in range(1, 9):
-                self.images[str(i)] = tk.PhotoImage(file=f'assets/number_{i}.gif')
-        except Exception as e:
-            print(f"Error loading images: {e}")
-            messagebox.showerror("Error", "Failed to load game images. Using text mode.")
-    
-    def create_buttons(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        self.button_frame = tk.Frame(self.master)
-        self.button_frame.grid(row=1, column=0, columnspan=cols)
-        
-        for row in range(rows):
-            for col in range(cols):
-                button = tk.Button(self.button_frame, image=self.images['covered'],
-                                 width=35, height=35,
-                                 command=lambda r=row, c=col: self.reveal_cell(r, c))
-                button.grid(row=row, column=col, padx=0, pady=0)
-                button.bind('<Button-3>', lambda e, r=row, c=col: self.toggle_flag(r, c))
-                self.buttons[(row, col)] = button
-
-    def toggle_flag(self, row, col):
-        if self.game_over or self.revealed[row][col]:
-            return
-        
-        if not self.flagged[row][col]:
-            if self.flags_placed < DIFFICULTY[self.difficulty]['mines']:
-                self.flagged[row][col] = True
-                self.flags_placed += 1
-                self.buttons[(row, col)].config(image=self.images['flag'])
-        else:
-            self.flagged[row][col] = False
-            self.flags_placed -= 1
-            self.buttons[(row, col)].config(image=self.images['covered'])
-        
-        self.mine_counter_label.config(text=f"Mines: {DIFFICULTY[self.difficulty]['mines'] - self.flags_placed}")
-        
-    def reveal_cell(self, row, col):
-        if self.game_over or self.revealed[row][col] or self.flagged[row][col]:
-            return
-        
-        if not self.start_time:
-            self.start_time = datetime.now()
-            self.timer_running = True
-            self.update_timer()
-        
-        self.revealed[row][col] = True
-
-        if self.board[row][col] == '*':
-            self.buttons[(row, col)].config(image=self.images['mine'], state='disabled')
-            self.game_over = True
-            self.timer_running = False
-            self.reveal_all_mines()
-            messagebox.showinfo("Game Over", "Better luck next time!")
-            self.disable_all_buttons()
-            return
-        
-        cell_value = self.board[row][col]
-        if cell_value == ' ':
-            self.buttons[(row, col)].config(image=self.images['uncovered'], state='disabled')
-        else:
-            self.buttons[(row, col)].config(image=self.images[cell_value], state='disabled')
-        if self.board[row][col] == ' ':
-            for r in range(row - 1, row + 2):
-                for c in range (col - 1, col + 2):
-                    if 0 <= r < ROW and 0 <= c < COL and not self.revealed[r][c]:
-                        self.reveal_cell(r, c)
-
-        if self.check_win():
-            self.game_over = True
-            self.timer_running = False
-            self.add_high_score(self.elapsed_time)
-            messagebox.showinfo("Congratulations!", f"You've won the game in {self.format_time(self.elapsed_time)}!\nCheck the high scores to see if you made it to the top 10!")
-            self.disable_all_buttons()
-
-    def disable_all_buttons(self):
-        for button in self.buttons.values():
-            button.config(state='disabled')
-
-    def reveal_all_mines(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        for row in range(rows):
-            for col in range(cols):
-                if self.board[row][col] == '*' and not self.flagged[row][col]:
-                    self.buttons[(row, col)].config(image=self.images['mine'])
-                elif self.flagged[row][col] and self.board[row][col] != '*':
-                    self.buttons[(row, col)].config(image=self.images['wrong'])
-    
-    def check_win(self):
-        rows, cols = DIFFICULTY[self.difficulty]['rows'], DIFFICULTY[self.difficulty]['cols']
-        for row in range(rows):
-            for col in range(cols):
-                if self.board[row][col] != '*' and not self.revealed[row][col]:
-                    return False
-        return True
+class StartupTimer:
+    # --timing: prints how long after launch each startup step finished
+    def __init__(self, enabled=False):
+        self.enabled = enabled
 
+    def mark(self, label, since=STARTED):
+        if self.enabled:
+            print(f"{label}: {(time.perf_counter() - since) * 1000:.1f} ms")
 
 
 class StartScreen:
-    def __init__(self, master):
+    # The menu comes up before the game module (and with it the engine and
+    # NumPy) is imported or any sprite is decoded; preload does that work
+    # once the menu has been drawn
+    def __init__(self, master, timing=None, instrumentation=None):
         self.master = master
+        self.timing = timing or StartupTimer()
+        self.instrumentation = instrumentation
         self.master.title("Minesweeper - Main Menu")
-        self.master.geometry("400x500")
+        self.master.geometry("400x600")
         self.master.resizable(False, False)
         self.master.configure(bg='#f0f0f0')  # Light gray background
         
-        # Initialize high scores
-        self.high_scores = {diff: [] for diff in DIFFICULTY.keys()}
-        try:
-            with open('highscores.json', 'r') as f:
-                self.high_scores.update(json.load(f))
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.save_high_scores()
+        # One scores service for the menu and every game window; opening the
+        # store imports any old highscores.json
+        self.scores = ScoresService(ScoreStore(), master)
         
         # Title
         title_frame = tk.Frame(master, pady=30, bg='#f0f0f0')
@@ -403,7 +62,33 @@ class StartScreen:
         
         for diff in DIFFICULTY.keys():
             tk.Radiobutton(diff_frame, text=diff, variable=self.difficulty, 
-                          value=diff, font=("Arial", 11), bg='#f0f0f0').pack(pady=5)
+                          value=diff, font=("Arial", 11), bg='#f0f0f0',
+                          command=self.update_custom_state).pack(pady=5)
+        tk.Radiobutton(diff_frame, text=CUSTOM, variable=self.difficulty,
+                      value=CUSTOM, font=("Arial", 11), bg='#f0f0f0',
+                      command=self.update_custom_state).pack(pady=5)
+        
+        # Custom size, enabled while Custom is selected
+        custom_frame = tk.Frame(diff_frame, bg='#f0f0f0')
+        custom_frame.pack(pady=(0, 10))
+        self.custom_rows = tk.IntVar(value=30)
+        self.custom_cols = tk.IntVar(value=50)
+        self.custom_mines = tk.IntVar(value=300)
+        self.custom_spinboxes = []
+        for label, variable in (("Rows", self.custom_rows), ("Columns", self.custom_cols),
+                                ("Mines", self.custom_mines)):
+            tk.Label(custom_frame, text=label, font=("Arial", 10),
+                     bg='#f0f0f0').pack(side=tk.LEFT, padx=(5, 2))
+            spinbox = tk.Spinbox(custom_frame, from_=1, to=999999, width=6,
+                                 textvariable=variable)
+            spinbox.pack(side=tk.LEFT)
+            self.custom_spinboxes.append(spinbox)
+        self.update_custom_state()
+        
+        self.no_guess = tk.BooleanVar(value=False)
+        tk.Checkbutton(button_frame, text="No-guess boards (solvable by logic alone)",
+                       variable=self.no_guess, font=("Arial", 10),
+                       bg='#f0f0f0').pack(anchor='w')
         
         # Action buttons
         style = ttk.Style()
@@ -413,7 +98,7 @@ class StartScreen:
         ttk.Button(button_frame, text="New Game", style='Large.TButton',
                    command=self.start_game).pack(fill='x', pady=10)
         ttk.Button(button_frame, text="High Scores", style='Large.TButton',
-                   command=self.show_high_scores).pack(fill='x', pady=10)
+                   command=lambda: self.scores.show(self.master)).pack(fill='x', pady=10)
         ttk.Button(button_frame, text="Exit", style='Large.TButton',
                    command=self.on_game_close).pack(fill='x', pady=10)
         
@@ -424,100 +109,54 @@ class StartScreen:
         x = (self.master.winfo_screenwidth() // 2) - (width // 2)
         y = (self.master.winfo_screenheight() // 2) - (height // 2)
         self.master.geometry(f'+{x}+{y}')
+        self.timing.mark("Start screen ready")
+        self.master.after_idle(self.preload)
     
-    def load_high_scores(self):
-        try:
-            with open('highscores.json', 'r') as f:
-                self.high_scores = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.high_scores = {diff: [] for diff in DIFFICULTY.keys()}
-            self.save_high_scores()
-    
-    def save_high_scores(self):
-        with open('highscores.json', 'w') as f:
-            json.dump(self.high_scores, f)
+    def preload(self):
+        # Import the game and decode its sprites while the menu sits idle,
+        # so New Game only has to build the board
+        started = time.perf_counter()
+        import game
+        from sprites import cell_size, load_sprites
+        load_sprites(self.master, cell_size(self.master))
+        self.timing.mark("Game and sprites preloaded", since=started)
     
-    def format_time(self, seconds):
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:02d}"
+    def update_custom_state(self):
+        state = 'normal' if self.difficulty.get() == CUSTOM else 'disabled'
+        for spinbox in self.custom_spinboxes:
+            spinbox.config(state=state)
     
-    def show_high_scores(self):
-        # Get the parent window (either game window or start screen)
-        parent = self.master
-        
-        scores_window = tk.Toplevel(parent)
-        scores_window.title("High Scores")
-        scores_window.transient(parent)
-        scores_window.grab_set()
-        scores_window.geometry("300x400")
-        scores_window.resizable(False, False)
-
-        # Style configuration
-        style = ttk.Style()
-        style.configure('Scores.TNotebook', background='#f0f0f0')
-        style.configure('Scores.TFrame', background='#f0f0f0')
-
-        notebook = ttk.Notebook(scores_window, style='Scores.TNotebook')
-        notebook.pack(padx=10, pady=10, expand=True, fill='both')
-
-        for difficulty in DIFFICULTY.keys():
-            frame = ttk.Frame(notebook, style='Scores.TFrame')
-            notebook.add(frame, text=difficulty)
-            frame.configure(padding=10)
-
-            scores = self.high_scores.get(difficulty, [])
-            if not scores:
-                ttk.Label(frame, text="No scores yet!", 
-                         font=("Arial", 11)).pack(pady=20)
-            else:
-                # Sort scores and take top 10
-                sorted_scores = sorted(scores)[:10]
-                for i, score in enumerate(sorted_scores, 1):
-                    formatted_time = self.format_time(score)
-                    ttk.Label(frame, text=f"{i}. {formatted_time}", 
-                             font=("Arial", 11)).pack(pady=2)
-
-        close_button = ttk.Button(scores_window, text="Close", 
-                                 command=scores_window.destroy)
-        close_button.pack(pady=10)
-
-        # Center the scores window
-        scores_window.update_idletasks()
-        width = scores_window.winfo_width()
-        height = scores_window.winfo_height()
-        x = (parent.winfo_rootx() + (parent.winfo_width() // 2) - (width // 2))
-        y = (parent.winfo_rooty() + (parent.winfo_height() // 2) - (height // 2))
-        scores_window.geometry(f'+{x}+{y}')
+    def start_game(self, seed=None):
+        difficulty = self.difficulty.get()
+        size = None
+        if difficulty == CUSTOM:
+            try:
+                size = (self.custom_rows.get(), self.custom_cols.get(), self.custom_mines.get())
+            except tk.TclError:
+                messagebox.showerror("Error", "Rows, columns and mines must be whole numbers.")
+                return
         
-        # Ensure the window is visible and focused
-        scores_window.lift()
-        scores_window.focus_force()
-    
-    def start_game(self):
+        started = time.perf_counter()
         try:
-            difficulty = self.difficulty.get()
+            from game import Minesweeper
             
             # Create and configure game window
             game_window = tk.Toplevel(self.master)
             game_window.title(f"Minesweeper - {difficulty}")
-            game_window.resizable(False, False)
             
             # Create the game instance
             game = Minesweeper(game_window, difficulty, 
-                             self.high_scores, self)
+                             self.scores, self, seed=seed,
+                             no_guess=self.no_guess.get(), size=size,
+                             instrumentation=self.instrumentation)
             
             # Configure window closing
-            def on_game_close():
-                if game.timer_running:
-                    game.timer_running = False
-                game_window.destroy()
-                self.master.deiconify()
-            
-            game_window.protocol("WM_DELETE_WINDOW", on_game_close)
+            game_window.protocol("WM_DELETE_WINDOW", game.return_to_menu)
             
             # Hide the start screen
             self.master.withdraw()
+            game_window.update_idletasks()
+            self.timing.mark("First board ready", since=started)
             
         except Exception as e:
             import traceback
@@ -534,7 +173,61 @@ class StartScreen:
 
 
 
-if __name__ == "__main__":
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play Minesweeper.")
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument('--difficulty', choices=list(DIFFICULTY),
+                       help="skip the menu and start a game at this preset")
+    start.add_argument('--size', nargs=3, type=int, metavar=('ROWS', 'COLS', 'MINES'),
+                       help="skip the menu and start a game of this size")
+    parser.add_argument('--seed', type=int, help="seed for the first board")
+    parser.add_argument('--no-guess', action='store_true', help="play no-guess boards")
+    parser.add_argument('--timing', action='store_true',
+                        help="print how long startup and the first board take")
+    parser.add_argument('--instrument', action='store_true',
+                        help="time every click, engine call and redraw; adds a debug "
+                             "overlay and exports to the Game menu")
+    parser.add_argument('--stats', metavar='FILE',
+                        help="write the timings as JSON on exit; implies --instrument")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="run under cProfile and write a pstats dump on exit; "
+                             "implies --instrument")
+    args = parser.parse_args(argv)
+    if args.size:
+        rows, cols, mines = args.size
+        if rows < 1 or cols < 1 or not 0 <= mines < rows * cols:
+            parser.error("--size needs at least one row and column, and fewer mines than cells")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    instrumentation = None
+    if args.instrument or args.stats or args.profile:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation(profile=bool(args.profile))
+        instrumentation.start_profile()
     root = tk.Tk()
-    start_screen = StartScreen(root)
+    start_screen = StartScreen(root, StartupTimer(args.timing), instrumentation)
+    start_screen.no_guess.set(args.no_guess)
+    if args.size:
+        start_screen.difficulty.set(CUSTOM)
+        for variable, value in zip((start_screen.custom_rows, start_screen.custom_cols,
+                                    start_screen.custom_mines), args.size):
+            variable.set(value)
+    elif args.difficulty:
+        start_screen.difficulty.set(args.difficulty)
+    start_screen.update_custom_state()
+    if args.size or args.difficulty:
+        start_screen.start_game(seed=args.seed)
     root.mainloop()
+    # Let any win still being saved reach the database
+    start_screen.scores.close()
+    if instrumentation:
+        instrumentation.stop_profile()
+        if args.stats:
+            instrumentation.export_json(args.stats)
+        if args.profile:
+            instrumentation.export_profile(args.profile)
+
+if __name__ == "__main__":
+    main()
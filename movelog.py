@@ -0,0 +1,250 @@
+import os
+import time
+import zlib
+from bisect import bisect_right
+
+from engine import CHORD, FLAG, PYTHON, REDO, REVEAL, UNDO, Board
+
+# Append-only binary move log, one file per game.
+#
+# A log starts with a header: MAGIC, a version byte, then the board's rows,
+# cols, mines, seed and the wall-clock start time in seconds. Every record
+# after it is an opcode byte followed by unsigned LEB128 varints:
+#
+#   REVEAL / FLAG / CHORD   ms since the previous move, cell index
+#   UNDO / REDO             ms since the previous move
+#   LAYOUT                  byte length, zlib-compressed mine bitmap
+#   SNAPSHOT                moves so far, byte length, zlib-compressed cells
+#
+# A move costs three to six bytes. The layout is written once, when the
+# first reveal places the mines. Every SNAPSHOT_INTERVAL moves the whole cell
+# buffer is stored, so replaying to any move starts from the nearest snapshot
+# instead of from the first click.
+
+MAGIC = b'MSLOG'
+VERSION = 1
+SNAPSHOT_INTERVAL = 64
+
+MOVE_CODES = {REVEAL: 1, FLAG: 2, CHORD: 3, UNDO: 6, REDO: 7}
+MOVES = {code: move for move, code in MOVE_CODES.items()}
+LAYOUT = 4
+SNAPSHOT = 5
+# Moves without a cell index
+HISTORY_CODES = {MOVE_CODES[UNDO], MOVE_CODES[REDO]}
+
+REPLAY_DIR = 'replays'
+
+
+def varint(n):
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return out
+
+
+def read_varint(data, position):
+    # Returns (value, position after it)
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def log_path(board, directory=REPLAY_DIR):
+    # A fresh file name for a game started now
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, f'{stamp}-{board.rows}x{board.cols}-{board.seed}.mslog')
+
+
+class MoveLog:
+    # Written through Board.log: set board.log = MoveLog(path) and every
+    # move that changes the board is appended. The file is created on the
+    # first move, so games that are never played leave nothing behind, and
+    # writes go through a buffered file that is flushed at each snapshot and
+    # when the game ends.
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.moves = 0
+        self.layout_written = False
+        self.last_ms = 0
+
+    def record(self, board, move, index):
+        if self.file is None:
+            self.open(board)
+        if not self.layout_written and board.generated:
+            bitmap = zlib.compress(board.mine_bitmap(), 1)
+            self.file.write(bytes([LAYOUT]) + varint(len(bitmap)) + bitmap)
+            self.layout_written = True
+
+        now = (time.monotonic_ns() - self.started) // 1000000
+        record = bytes([MOVE_CODES[move]]) + varint(now - self.last_ms)
+        if index is not None:
+            record += varint(index)
+        self.file.write(record)
+        self.last_ms = now
+        self.moves += 1
+
+        if self.moves % SNAPSHOT_INTERVAL == 0 and board.generated:
+            self.snapshot(board)
+        if board.game_over:
+            self.file.flush()
+
+    def snapshot(self, board):
+        cells = zlib.compress(board.cells, 1)
+        self.file.write(bytes([SNAPSHOT]) + varint(self.moves) + varint(len(cells)) + cells)
+        self.file.flush()
+
+    def open(self, board):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.started = time.monotonic_ns()
+        self.file = open(self.path, 'wb')
+        self.file.write(MAGIC + bytes([VERSION]))
+        for value in (board.rows, board.cols, board.mines, board.seed, int(time.time())):
+            self.file.write(varint(value))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_records(data):
+    # Stream (opcode, time in ms, value) out of a log's bytes. Moves carry
+    # the cell index, or None for undo and redo; LAYOUT and SNAPSHOT carry
+    # their compressed bytes, with a snapshot's move count as the time. The
+    # header comes first, as (None, 0, (rows, cols, mines, seed, started)).
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        raise ValueError("Not a move log")
+    position = len(MAGIC) + 1
+    header = []
+    for _ in range(5):
+        value, position = read_varint(data, position)
+        header.append(value)
+    yield None, 0, tuple(header)
+
+    now = 0
+    end = len(data)
+    while position < end:
+        code = data[position]
+        if code in HISTORY_CODES:
+            delta, position = read_varint(data, position + 1)
+            now += delta
+            yield code, now, None
+        elif code in MOVES:
+            delta, position = read_varint(data, position + 1)
+            index, position = read_varint(data, position)
+            now += delta
+            yield code, now, index
+        elif code == LAYOUT:
+            length, position = read_varint(data, position + 1)
+            yield code, now, data[position:position + length]
+            position += length
+        elif code == SNAPSHOT:
+            moves, position = read_varint(data, position + 1)
+            length, position = read_varint(data, position)
+            yield code, moves, data[position:position + length]
+            position += length
+        else:
+            raise ValueError(f"Unknown record {code} at byte {position}")
+
+
+def iter_moves(path):
+    # (move, time in ms, index) for every move in a log, without rebuilding
+    # any board; the fast path for batch analysis
+    with open(path, 'rb') as f:
+        data = f.read()
+    for code, ms, value in read_records(data):
+        if code in MOVES:
+            yield MOVES[code], ms, value
+
+
+class Replay:
+    # A recorded game, loaded into memory. board_at(n) rebuilds the board as
+    # it was after its first n moves.
+    #
+    # Undo and redo are resolved while loading: for every point in the game
+    # the replay knows which moves are still in effect, so rebuilding a board
+    # never has to undo anything, just play those moves in order.
+    def __init__(self, data):
+        records = read_records(data)
+        _, _, (self.rows, self.cols, self.mines, self.seed, self.started) = next(records)
+        self.moves = []       # (move, time in ms, index), undo and redo included
+        self.layout = None    # compressed mine bitmap, once mines were placed
+        self.snapshots = []   # (moves so far, moves in effect, compressed cells)
+        done, undone = [], []
+        for code, ms, value in records:
+            if code in MOVES:
+                move = MOVES[code]
+                if move == UNDO:
+                    undone.append(done.pop())
+                elif move == REDO:
+                    done.append(undone.pop())
+                else:
+                    done.append(len(self.moves))
+                    undone.clear()
+                self.moves.append((move, ms, value))
+            elif code == LAYOUT:
+                self.layout = value
+            else:
+                self.snapshots.append((ms, done[:], value))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def duration_ms(self):
+        return self.moves[-1][1] if self.moves else 0
+
+    def board_at(self, move=None):
+        # Board after the first `move` moves (all of them by default): start
+        # from the latest snapshot taken at or before it, provided the moves
+        # in effect then are still in effect, and play the rest
+        if move is None:
+            move = len(self.moves)
+        if not 0 <= move <= len(self.moves):
+            raise IndexError(f"The game has {len(self.moves)} moves")
+        done = self.in_effect(move)
+        board = Board(self.rows, self.cols, self.mines, backend=PYTHON, seed=self.seed)
+        start = 0
+        k = bisect_right([moves for moves, _, _ in self.snapshots], move)
+        for _, snapshot_done, cells in reversed(self.snapshots[:k]):
+            if done[:len(snapshot_done)] == snapshot_done:
+                board.load_cells(zlib.decompress(cells))
+                start = len(snapshot_done)
+                break
+        else:
+            if self.layout is not None:
+                board.set_mine_bitmap(zlib.decompress(self.layout))
+        actions = {REVEAL: board.reveal, FLAG: board.toggle_flag, CHORD: board.chord}
+        for position in done[start:]:
+            kind, _, index = self.moves[position]
+            actions[kind](*board.coords(index))
+        return board
+
+    def in_effect(self, move):
+        # Positions of the moves still in effect after the first `move`
+        # moves, in the order they were played
+        done, undone = [], []
+        for position, (kind, _, _) in enumerate(self.moves[:move]):
+            if kind == UNDO:
+                undone.append(done.pop())
+            elif kind == REDO:
+                done.append(undone.pop())
+            else:
+                done.append(position)
+                undone.clear()
+        return done
@@ -0,0 +1,199 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from engine import COUNT_MASK, COUNTED, MINE_BIT, PYTHON, REVEALED, Board
+from solver import Solver
+
+# Mine moves tried on one candidate before it is abandoned
+MAX_REPAIRS = 40
+# Candidates tried before giving up on a no-guess layout altogether
+MAX_ATTEMPTS = 2000
+# Seconds a LayoutSearch runs before the game settles for an ordinary layout
+TIMEOUT = 5
+WORKERS = os.cpu_count() or 1
+
+# Process pool shared by every LayoutSearch in this process, started on first use
+pool = None
+
+
+def no_guess_layout(rows, cols, mines, first_index, seed=None, safe_neighbours=True,
+                    workers=1, executor=None, timeout=None, cancelled=None):
+    # Mine positions for a board that the logic-only solver can win from a
+    # first click on first_index, or None if there is none within
+    # MAX_ATTEMPTS candidates, `timeout` seconds, or before the `cancelled`
+    # Event is set.
+    #
+    # Candidate k is drawn from seed + k. Each one is played by the solver
+    # and, when it gets stuck, repaired by moving a mine off the stuck
+    # frontier rather than thrown away. Candidates are evaluated in batches,
+    # in parallel when workers > 1, and the lowest successful k wins, so a
+    # search that finishes in time depends on the seed alone and not on the
+    # worker count.
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    # The monotonic clock is system-wide, so the worker processes can check
+    # the deadline too, and clock changes cannot cut it short or stretch it
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    own_executor = executor is None and workers > 1
+    if own_executor:
+        executor = ProcessPoolExecutor(workers)
+    batch = workers if executor is not None else 1
+    try:
+        for start in range(0, MAX_ATTEMPTS, batch):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            args = [(rows, cols, mines, first_index, seed + k, safe_neighbours, MAX_REPAIRS,
+                     deadline) for k in range(start, start + batch)]
+            if executor is None:
+                results = [repair_candidate(*args[0])]
+            else:
+                results = list(executor.map(repair_candidate, *zip(*args)))
+            if deadline is not None and time.monotonic() > deadline:
+                # Candidates cut short may have hidden a lower k
+                return None
+            for positions in results:
+                if positions is not None:
+                    return positions
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    return None
+
+
+def repair_candidate(rows, cols, mines, first_index, seed, safe_neighbours=True,
+                     max_repairs=MAX_REPAIRS, deadline=None):
+    # Returns the mine positions of a solvable layout grown from this seed,
+    # or None if it could not be repaired in time
+    rng = random.Random(seed)
+    board = Board(rows, cols, mines, backend=PYTHON,
+                  safe_neighbours=safe_neighbours, seed=seed)
+    board.generate(first_index)
+    positions = {i for i, cell in enumerate(board.cells) if cell & MINE_BIT}
+    protected = set(board.safe_cells(first_index))
+    first = board.coords(first_index)
+
+    solver = Solver(board)
+    solver.update(board.reveal(*first))
+    repaired = False
+    for _ in range(max_repairs + 1):
+        if solver.solve():
+            if not repaired:
+                return sorted(positions)
+            # The solver picked up where it got stuck, but its earlier
+            # deductions may have leant on numbers the moves changed. Only a
+            # replay from the first click proves the layout; if that gets
+            # stuck, repairs carry on from there.
+            board.set_mines(positions)
+            solver = Solver(board)
+            solver.update(board.reveal(*first))
+            repaired = False
+            continue
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        if not move_stuck_mine(board, solver, positions, protected, rng):
+            return None
+        repaired = True
+    return None
+
+
+def move_stuck_mine(board, solver, positions, protected, rng):
+    # Move one undecided mine on the stuck frontier to a covered cell out of
+    # sight of every revealed number, so the numbers around the frontier
+    # change while the solved part of the board keeps its shape. The board
+    # and solver are updated in place, ready to carry on solving.
+    stuck = [cell for cells, _ in solver.constraints() for cell in cells
+             if cell in positions and cell not in solver.mines]
+    if not stuck:
+        return False
+
+    cells = board.cells
+    hidden = [index for index, cell in enumerate(cells)
+              if not cell & (REVEALED | MINE_BIT) and index not in protected
+              and not any(cells[n] & REVEALED for n in board.neighbours(index))]
+    if not hidden:
+        return False
+
+    source = rng.choice(stuck)
+    target = rng.choice(hidden)
+    positions.remove(source)
+    positions.add(target)
+    # Uncount both cells and adjust the counts already filled in around
+    # them; none of target's neighbours is revealed, so only numbers next
+    # to source change on screen
+    cells[source] &= ~(MINE_BIT | COUNTED | COUNT_MASK)
+    cells[target] = cells[target] & ~(COUNTED | COUNT_MASK) | MINE_BIT
+    for neighbour in board.neighbours(source):
+        if cells[neighbour] & COUNTED and not cells[neighbour] & MINE_BIT:
+            cells[neighbour] -= 1
+    for neighbour in board.neighbours(target):
+        if cells[neighbour] & COUNTED and not cells[neighbour] & MINE_BIT:
+            cells[neighbour] += 1
+    solver.pending.update(n for n in board.neighbours(source) if n in solver.frontier)
+    return True
+
+
+def shared_pool():
+    global pool
+    if pool is None:
+        pool = ProcessPoolExecutor(WORKERS)
+    return pool
+
+
+def discard_pool(executor):
+    global pool
+    if pool is executor:
+        pool = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LayoutSearch:
+    # no_guess_layout on a background thread, with its candidates spread
+    # over the shared process pool, so the Tk thread never waits on it.
+    # Poll done(); `result` then holds the mine positions, or None if no
+    # layout turned up within `timeout` seconds. cancel() stops the search
+    # after the batch in hand.
+    def __init__(self, rows, cols, mines, first_index, seed, safe_neighbours=True,
+                 timeout=TIMEOUT):
+        self.result = None
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run,
+            args=(rows, cols, mines, first_index, seed, safe_neighbours, timeout, shared_pool()),
+            name='no-guess', daemon=True)
+        self.thread.start()
+
+    def run(self, rows, cols, mines, first_index, seed, safe_neighbours, timeout, executor):
+        try:
+            self.result = no_guess_layout(rows, cols, mines, first_index, seed=seed,
+                                          safe_neighbours=safe_neighbours, workers=WORKERS,
+                                          executor=executor, timeout=timeout,
+                                          cancelled=self.cancelled)
+        except BrokenProcessPool:
+            # A worker died: fall back as if out of time, and let the next
+            # search start a fresh pool
+            discard_pool(executor)
+        except OSError:
+            pass  # no worker processes could be started
+        finally:
+            self.finished.set()
+
+    def done(self):
+        return self.finished.is_set()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def generate_no_guess(rows, cols, mines, row, col, seed=None, **kwargs):
+    # A fresh board with a no-guess layout for a first click at (row, col)
+    board = Board(rows, cols, mines, seed=seed)
+    positions = no_guess_layout(rows, cols, mines, row * cols + col, seed=board.seed, **kwargs)
+    if positions is None:
+        raise RuntimeError(f"No no-guess layout found after {MAX_ATTEMPTS} candidates")
+    board.set_mines(positions)
+    return board
@@ -0,0 +1,7 @@
+# The standard board sizes. Kept apart from the engine so the start screen
+# can list them without importing the engine and NumPy.
+DIFFICULTY = {
+    'Beginner': {'rows': 9, 'cols': 9, 'mines': 10},
+    'Intermediate': {'rows': 16, 'cols': 16, 'mines': 40},
+    'Expert': {'rows': 16, 'cols': 30, 'mines': 99}
+}
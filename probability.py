@@ -0,0 +1,156 @@
+from math import comb
+
+from engine import COUNT_MASK, FLAGGED, REVEALED
+from solver import Solver, count_solutions, split_components
+
+
+class ProbabilityEngine:
+    # Exact mine probability for every covered cell, given the revealed
+    # numbers, the flags and the board's total mine count.
+    #
+    # The frontier comes from a Solver, kept up to date incrementally. The
+    # frontier is split into independent components, and each component's
+    # solutions are counted by number of mines. The counts are memoised by
+    # the component's constraints, so a move only re-enumerates the
+    # components it actually touched. Components are combined with the
+    # cells out of sight of any number (the interior) by weighting every
+    # split of the remaining mines with the number of ways to place the rest
+    # in the interior.
+    def __init__(self, board, trust_flags=True):
+        self.board = board
+        self.trust_flags = trust_flags
+        self.solver = Solver(board)
+        self.components = {}  # constraints -> (cells, {mines: (solutions, hits)})
+        self.result = None
+
+    def update(self, changed):
+        # Feed in the cells a move changed (reveals and flag toggles alike)
+        self.solver.update(changed)
+        self.result = None
+
+    def probabilities(self):
+        # {cell index: probability of a mine} for every covered cell,
+        # cached until the next update
+        if self.result is None:
+            self.solver.apply_single()
+            result = self.compute(self.trust_flags)
+            if result is None and self.trust_flags:
+                # The flags contradict the numbers; ignore them
+                result = self.compute(False)
+            self.result = result or {}
+        return self.result
+
+    def safest(self):
+        # The covered cell least likely to be a mine, and its probability
+        probabilities = self.probabilities()
+        known = self.known_mines(self.trust_flags)
+        index = min((i for i in probabilities if i not in known), key=probabilities.get,
+                    default=None)
+        return index, probabilities.get(index)
+
+    def known_mines(self, trust_flags):
+        known = set(self.solver.mines)
+        if trust_flags:
+            known.update(i for i, cell in enumerate(self.board.cells)
+                         if cell & FLAGGED and not cell & REVEALED)
+        return known
+
+    def constraints(self, known):
+        board, cells = self.board, self.board.cells
+        found = {}
+        for index in self.solver.frontier:
+            unknown = []
+            need = cells[index] & COUNT_MASK
+            for neighbour in board.neighbours(index):
+                if cells[neighbour] & REVEALED:
+                    continue
+                if neighbour in known:
+                    need -= 1
+                else:
+                    unknown.append(neighbour)
+            if unknown:
+                found[tuple(sorted(unknown))] = need
+        return list(found.items())
+
+    def count_component(self, cells, constraints):
+        # Memoised by the component's constraints, so untouched components
+        # are not enumerated again
+        key = frozenset(constraints)
+        cached = self.components.get(key)
+        if cached is None:
+            cached = (cells, count_solutions(cells, constraints, len(cells)))
+        self.fresh[key] = cached
+        return cached
+
+    def compute(self, trust_flags):
+        board, cells = self.board, self.board.cells
+        known = self.known_mines(trust_flags)
+        remaining = board.mines - len(known)
+        if remaining < 0:
+            return None
+
+        # Only the components seen in this state stay cached
+        self.fresh = {}
+        components = [self.count_component(component_cells, component_constraints)
+                      for component_cells, component_constraints
+                      in split_components(self.constraints(known))]
+        self.components = self.fresh
+
+        frontier = {cell for component_cells, _ in components for cell in component_cells}
+        interior = [i for i, cell in enumerate(cells)
+                    if not cell & REVEALED and i not in known and i not in frontier]
+        free = len(interior)
+
+        # Number of solutions over all components by total frontier mines,
+        # plus the same with each component left out
+        counts = [{m: solutions for m, (solutions, _) in by_mines.items()}
+                  for _, by_mines in components]
+        prefix = [{0: 1}]
+        for count in counts:
+            prefix.append(convolve(prefix[-1], count, remaining))
+        suffix = [{0: 1}]
+        for count in reversed(counts):
+            suffix.append(convolve(suffix[-1], count, remaining))
+        suffix.reverse()
+
+        def weight(mines):
+            # Ways to put the mines the frontier does not use in the interior
+            rest = remaining - mines
+            return comb(free, rest) if 0 <= rest <= free else 0
+
+        total = sum(solutions * weight(m) for m, solutions in prefix[-1].items())
+        if not total:
+            return None
+
+        result = {index: 1.0 for index in known if not cells[index] & REVEALED}
+        for k, (component_cells, by_mines) in enumerate(components):
+            others = convolve(prefix[k], suffix[k + 1], remaining)
+            hits = [0] * len(component_cells)
+            for m, (_, cell_hits) in by_mines.items():
+                ways = sum(solutions * weight(m + s) for s, solutions in others.items())
+                if ways:
+                    for i, hit in enumerate(cell_hits):
+                        hits[i] += hit * ways
+            for cell, hit in zip(component_cells, hits):
+                result[cell] = hit / total
+
+        if free:
+            # Every interior cell is equally likely: average the mines left
+            # to the interior over all weighted solutions
+            interior_mines = sum(solutions * weight(m) * (remaining - m)
+                                 for m, solutions in prefix[-1].items())
+            probability = interior_mines / (total * free)
+            for index in interior:
+                result[index] = probability
+        return result
+
+
+def convolve(a, b, limit):
+    # Distribution of the summed mine counts of two independent parts,
+    # dropping totals above limit
+    result = {}
+    for m, x in a.items():
+        for n, y in b.items():
+            if m + n <= limit:
+                result[m + n] = result.get(m + n, 0) + x * y
+    return result
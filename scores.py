@@ -0,0 +1,159 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = 'highscores.db'
+# Scores from before the database, imported once when it is created
+LEGACY_PATH = 'highscores.json'
+SCHEMA_VERSION = 1
+
+# Scores shown per leaderboard page
+MAX_SCORES = 10
+
+
+class ScoreStore:
+    # High scores in SQLite, one row per won game. WAL mode lets any number
+    # of game windows read while one writes, and each write is a single
+    # transaction, so concurrent windows never clobber each other and a crash
+    # never leaves a half-written file. The (board_key, time_ms) index keeps
+    # every board size's times in order, so top-k, ranks and personal bests
+    # are short index scans instead of loading every score.
+    def __init__(self, path=DB_PATH, legacy_path=LEGACY_PATH):
+        self.path = path
+        # Autocommit; transactions are opened explicitly where needed
+        self.connection = sqlite3.connect(path, timeout=10, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.migrate(legacy_path)
+
+    def migrate(self, legacy_path):
+        connection = self.connection
+        # Take the write lock first, so two windows starting at once cannot
+        # both import the old scores
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                connection.execute('''
+                    CREATE TABLE IF NOT EXISTS scores (
+                        id INTEGER PRIMARY KEY,
+                        board_key TEXT NOT NULL,
+                        time_ms INTEGER NOT NULL,
+                        played_at TEXT,
+                        board_id TEXT,
+                        clicks INTEGER
+                    )''')
+                connection.execute('CREATE INDEX IF NOT EXISTS scores_by_board '
+                                   'ON scores (board_key, time_ms)')
+                connection.executemany(
+                    'INSERT INTO scores (board_key, time_ms) VALUES (?, ?)',
+                    legacy_scores(legacy_path))
+            if version < SCHEMA_VERSION:
+                connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def add(self, board_key, time_ms, board_id=None, clicks=None):
+        # Record a win; returns its 1-based rank for the board
+        self.connection.execute(
+            'INSERT INTO scores (board_key, time_ms, played_at, board_id, clicks) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (board_key, time_ms, time.strftime('%Y-%m-%d %H:%M:%S'), board_id, clicks))
+        return self.rank(board_key, time_ms)
+
+    def rank(self, board_key, time_ms):
+        # Rank a time has, or would have, on the board; equal times share a rank
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM scores WHERE board_key = ? AND time_ms < ?',
+            (board_key, time_ms)).fetchone()[0] + 1
+
+    def top(self, board_key, limit=MAX_SCORES, offset=0):
+        # Fastest scores for a board, best first
+        return self.connection.execute(
+            'SELECT * FROM scores WHERE board_key = ? ORDER BY time_ms, id LIMIT ? OFFSET ?',
+            (board_key, limit, offset)).fetchall()
+
+    def personal_best(self, board_key):
+        rows = self.top(board_key, 1)
+        return rows[0] if rows else None
+
+    def count(self, board_key):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM scores WHERE board_key = ?', (board_key,)).fetchone()[0]
+
+    def board_keys(self):
+        # Every board that has scores
+        return [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT board_key FROM scores ORDER BY board_key')]
+
+    def close(self):
+        self.connection.close()
+
+
+class ScoreWriter:
+    # Saves scores on a background thread, so a win never waits on the disk.
+    # The thread opens its own connection to the database at path (SQLite
+    # connections belong to the thread that made them); each score's
+    # (token, board_key, rank, error) is put on `results` once it is stored,
+    # with rank None and the exception as error if saving failed. board_id
+    # may be a function returning it, called on the thread, so the caller
+    # never waits on encoding it.
+    def __init__(self, path=DB_PATH):
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, args=(path,),
+                                       name='score-writer', daemon=True)
+        self.thread.start()
+
+    def add(self, board_key, time_ms, board_id=None, clicks=None, token=None):
+        self.requests.put((token, board_key, time_ms, board_id, clicks))
+
+    def run(self, path):
+        store = None
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            token, board_key, time_ms, board_id, clicks = request
+            if callable(board_id):
+                board_id = board_id()
+            try:
+                if store is None:
+                    # The schema is already in place; the main store migrated it
+                    store = ScoreStore(path, legacy_path=None)
+                rank = store.add(board_key, time_ms, board_id=board_id, clicks=clicks)
+                self.results.put((token, board_key, rank, None))
+            except sqlite3.Error as e:
+                self.results.put((token, board_key, None, e))
+        if store is not None:
+            store.close()
+
+    def close(self):
+        # Finish the queued writes, then stop the thread
+        self.requests.put(None)
+        self.thread.join()
+
+
+def format_time(ms, millis=False):
+    # mm:ss for a time in milliseconds, or mm:ss.mmm with millis
+    seconds, ms = divmod(ms, 1000)
+    text = f"{seconds // 60:02d}:{seconds % 60:02d}"
+    return f"{text}.{ms:03d}" if millis else text
+
+
+def legacy_scores(path):
+    # (board_key, time_ms) for each score in an old highscores.json, which
+    # held whole seconds per difficulty
+    if not path:
+        return []
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [(key, int(seconds * 1000)) for key, times in data.items() for seconds in times]
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import (DEFAULT_BACKEND, DIFFICULTY, FLAGGED, NUMPY, PYTHON, REVEALED, WON, Board,
+                    board_name)
+from histogram import LatencyHistogram
+from movelog import MoveLog
+from probability import ProbabilityEngine
+from solver import Solver
+
+# Headless bulk simulation and benchmark harness.
+#
+#   python simulate.py --games 1000 --strategy solver
+#   python simulate.py --size 100 100 2000 --games 200 --workers 4 --json out.json
+#
+# Games are split into chunks that run in a process pool. Each chunk derives
+# its boards and moves from (seed, chunk number) alone, so outcomes are
+# reproducible for a given seed whatever the worker count. Only the timings
+# vary between runs. Chunk results are merged as they complete.
+
+OPERATIONS = ('generate', 'calculate_numbers', 'reveal', 'flag', 'probability')
+
+
+class ChunkStats:
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.clicks = 0
+        self.seconds = 0.0
+        self.latency = {op: LatencyHistogram() for op in OPERATIONS}
+
+    def timed(self, op, func, *args):
+        start = time.perf_counter_ns()
+        result = func(*args)
+        self.latency[op].add(time.perf_counter_ns() - start)
+        return result
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.clicks += other.clicks
+        self.seconds += other.seconds
+        for op, histogram in other.latency.items():
+            self.latency[op].merge(histogram)
+
+
+def start_game(board, stats, index):
+    # Time mine placement and counting as separate steps, then make the
+    # first click. As in Board.generate, only the NumPy backend counts the
+    # whole board up front; the Python backend counts cells as they open,
+    # inside 'reveal'.
+    stats.timed('generate', board.generate, index, False)
+    if board.backend == NUMPY:
+        stats.timed('calculate_numbers', board.calculate_numbers)
+    return reveal(board, stats, index)
+
+
+def reveal(board, stats, index):
+    stats.clicks += 1
+    return stats.timed('reveal', board.reveal, *board.coords(index))
+
+
+def flag(board, stats, index):
+    stats.clicks += 1
+    return stats.timed('flag', board.toggle_flag, *board.coords(index))
+
+
+def random_covered(board, rng, exclude=()):
+    # Uniformly random covered, unflagged cell
+    cells = board.cells
+    candidates = [i for i, cell in enumerate(cells)
+                  if not cell & (REVEALED | FLAGGED) and i not in exclude]
+    return rng.choice(candidates)
+
+
+def play_random(board, rng, stats):
+    # Click covered cells at random until the game ends
+    start_game(board, stats, rng.randrange(len(board.cells)))
+    while not board.game_over:
+        reveal(board, stats, random_covered(board, rng))
+
+
+def play_solver(board, rng, stats):
+    # Open the centre, then follow the solver: flag deduced mines, open
+    # deduced safe cells, and guess at random only when logic stalls
+    solver = Solver(board)
+    solver.update(start_game(board, stats, board.index(board.rows // 2, board.cols // 2)))
+    flagged = set()
+    while not board.game_over:
+        if not solver.safe and not solver.deduce():
+            solver.update(reveal(board, stats, random_covered(board, rng, solver.mines)))
+            continue
+        for index in solver.mines - flagged:
+            flag(board, stats, index)
+            flagged.add(index)
+        while solver.safe and not board.game_over:
+            solver.update(reveal(board, stats, solver.safe.pop()))
+
+
+def play_probability(board, rng, stats):
+    # Open the centre, then open every cell known to be safe, or else the
+    # cell least likely to be a mine
+    engine = ProbabilityEngine(board)
+    engine.update(start_game(board, stats, board.index(board.rows // 2, board.cols // 2)))
+    cells = board.cells
+    while not board.game_over:
+        probabilities = stats.timed('probability', engine.probabilities)
+        safe = [index for index, p in probabilities.items() if p == 0]
+        for index in safe or [engine.safest()[0]]:
+            if board.game_over:
+                break
+            if not cells[index] & REVEALED:
+                engine.update(reveal(board, stats, index))
+
+
+STRATEGIES = {
+    'random': play_random,
+    'solver': play_solver,
+    'probability': play_probability,
+}
+
+
+def play_chunk(rows, cols, mines, strategy, seed, chunk, games, backend, no_guess,
+               replays=None):
+    rng = random.Random(f'{seed}:{chunk}')
+    play = STRATEGIES[strategy]
+    stats = ChunkStats()
+    start = time.perf_counter()
+    for game in range(games):
+        board = Board(rows, cols, mines, backend=backend, seed=rng.getrandbits(32),
+                      no_guess=no_guess)
+        if replays:
+            board.log = MoveLog(os.path.join(replays, f'{rows}x{cols}-{mines}-{seed}-{chunk}-{game}.mslog'))
+        play(board, rng, stats)
+        if replays:
+            board.log.close()
+        stats.games += 1
+        stats.wins += board.state == WON
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def simulate(rows, cols, mines, games, strategy='solver', seed=0, workers=1,
+             chunk_size=100, backend=DEFAULT_BACKEND, no_guess=False, replays=None,
+             progress=None):
+    chunks = [(start // chunk_size, min(chunk_size, games - start))
+              for start in range(0, games, chunk_size)]
+    args = [(rows, cols, mines, strategy, seed, chunk, size, backend, no_guess, replays)
+            for chunk, size in chunks]
+    totals = ChunkStats()
+    start = time.perf_counter()
+    if workers <= 1:
+        results = (play_chunk(*chunk_args) for chunk_args in args)
+    else:
+        executor = ProcessPoolExecutor(workers)
+        results = (future.result() for future in
+                   as_completed([executor.submit(play_chunk, *chunk_args) for chunk_args in args]))
+    try:
+        for stats in results:
+            totals.merge(stats)
+            if progress:
+                progress(totals)
+    finally:
+        if workers > 1:
+            executor.shutdown(cancel_futures=True)
+    totals.seconds = time.perf_counter() - start
+    return totals
+
+
+def report(name, stats):
+    print(f"\n{name}: {stats.games} games, win rate {stats.wins / stats.games:.1%}, "
+          f"{stats.clicks / stats.games:.1f} clicks/game, "
+          f"{stats.games / stats.seconds:.1f} games/s")
+    print(f"  {'operation':<18}{'calls':>10}{'mean':>12}{'p50':>12}{'p90':>12}{'p99':>12}{'max':>12}")
+    for op, histogram in stats.latency.items():
+        if not histogram.count:
+            continue
+        row = [histogram.mean, histogram.percentile(50), histogram.percentile(90),
+               histogram.percentile(99), histogram.max]
+        print(f"  {op:<18}{histogram.count:>10}" + ''.join(f"{ns / 1000:>10.1f}us" for ns in row))
+
+
+def summary(stats):
+    return {
+        'games': stats.games,
+        'wins': stats.wins,
+        'win_rate': stats.wins / stats.games,
+        'clicks_per_game': stats.clicks / stats.games,
+        'games_per_second': stats.games / stats.seconds,
+        'latency': {op: histogram.to_dict() for op, histogram in stats.latency.items()},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play Minesweeper games headlessly and report performance.")
+    parser.add_argument('--games', type=int, default=1000, help="games per board size")
+    parser.add_argument('--difficulty', action='append', choices=list(DIFFICULTY),
+                        help="preset to play; repeatable (default: all presets)")
+    parser.add_argument('--size', action='append', nargs=3, type=int,
+                        metavar=('ROWS', 'COLS', 'MINES'), help="custom board size; repeatable")
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='solver')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--backend', choices=[PYTHON, NUMPY], default=DEFAULT_BACKEND)
+    parser.add_argument('--no-guess', action='store_true', help="play no-guess boards")
+    parser.add_argument('--replays', metavar='DIR', help="write a move log of every game to DIR")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [(name, DIFFICULTY[name]['rows'], DIFFICULTY[name]['cols'], DIFFICULTY[name]['mines'])
+             for name in args.difficulty or ([] if args.size else DIFFICULTY)]
+    sizes += [(board_name(rows, cols, mines), rows, cols, mines) for rows, cols, mines in args.size or []]
+
+    def progress(stats):
+        print(f"\r  {stats.games}/{args.games} games", end='', file=sys.stderr, flush=True)
+
+    results = {}
+    for name, rows, cols, mines in sizes:
+        print(f"{name} ({rows}x{cols}, {mines} mines)", file=sys.stderr)
+        stats = simulate(rows, cols, mines, args.games, strategy=args.strategy, seed=args.seed,
+                         workers=args.workers, chunk_size=args.chunk_size,
+                         backend=args.backend, no_guess=args.no_guess, replays=args.replays,
+                         progress=progress)
+        print(file=sys.stderr)
+        report(name, stats)
+        results[name] = summary(stats)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'strategy': args.strategy, 'seed': args.seed, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
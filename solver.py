@@ -0,0 +1,283 @@
+from collections import defaultdict
+from math import comb
+
+from engine import COUNT_MASK, REVEALED, WON
+
+# Largest frontier component the solver will enumerate exhaustively
+MAX_COMPONENT = 48
+
+
+class Solver:
+    # Logic-only player for an engine Board. It reads only what a player can
+    # see, revealed counts and the total mine count, and never looks at the
+    # mine bits.
+    #
+    # The frontier is the set of revealed numbers that still border covered
+    # cells not known to be mines. It is maintained incrementally: each move
+    # reports the cells it opened, and only the frontier cells around them
+    # are queued for the single-cell rule. Subset and exhaustive reasoning
+    # run only when that stalls.
+    def __init__(self, board, max_component=MAX_COMPONENT):
+        self.board = board
+        self.max_component = max_component
+        self.mines = set()     # cells deduced to hold a mine
+        self.safe = set()      # covered cells deduced to be safe
+        self.frontier = set()
+        self.pending = set()   # frontier cells to re-check with the single-cell rule
+        self.update(i for i, cell in enumerate(board.cells) if cell & REVEALED)
+
+    def update(self, opened):
+        # Feed in the cells a move changed
+        board, cells, frontier, pending = self.board, self.board.cells, self.frontier, self.pending
+        for index in opened:
+            cell = cells[index]
+            if not cell & REVEALED:
+                continue  # a mine exposed at game over, or a flag
+            self.safe.discard(index)
+            if cell & COUNT_MASK:
+                frontier.add(index)
+                pending.add(index)
+            for neighbour in board.neighbours(index):
+                if neighbour in frontier:
+                    pending.add(neighbour)
+
+    def constraint(self, index):
+        # Covered neighbours of a frontier cell not known to be mines, and how
+        # many mines are still among them
+        cells = self.board.cells
+        unknown = []
+        need = cells[index] & COUNT_MASK
+        for neighbour in self.board.neighbours(index):
+            if cells[neighbour] & REVEALED:
+                continue
+            if neighbour in self.mines:
+                need -= 1
+            else:
+                unknown.append(neighbour)
+        return unknown, need
+
+    def constraints(self):
+        # Every live frontier constraint as (cells, need), deduplicated
+        found = {}
+        for index in list(self.frontier):
+            unknown, need = self.constraint(index)
+            if unknown:
+                found[tuple(unknown)] = need
+            else:
+                self.frontier.discard(index)
+        return list(found.items())
+
+    def mark_mine(self, index):
+        if index in self.mines:
+            return
+        self.mines.add(index)
+        for neighbour in self.board.neighbours(index):
+            if neighbour in self.frontier:
+                self.pending.add(neighbour)
+
+    def mark_safe(self, index):
+        if index not in self.mines:
+            self.safe.add(index)
+
+    def apply_single(self):
+        # A number whose unknown neighbours are all mines, or all safe
+        found = False
+        while self.pending:
+            index = self.pending.pop()
+            unknown, need = self.constraint(index)
+            if not unknown:
+                self.frontier.discard(index)
+            elif need == 0:
+                for neighbour in unknown:
+                    if neighbour not in self.safe:
+                        self.mark_safe(neighbour)
+                        found = True
+            elif need == len(unknown):
+                for neighbour in unknown:
+                    self.mark_mine(neighbour)
+                found = True
+        return found
+
+    def apply_subset(self):
+        # When one constraint's cells are a subset of another's, the cells in
+        # the difference hold exactly the difference in mines
+        constraints = [(frozenset(cells), need) for cells, need in self.constraints()]
+        by_cell = defaultdict(list)
+        for k, (cells, _) in enumerate(constraints):
+            for cell in cells:
+                by_cell[cell].append(k)
+
+        found = False
+        for k, (inner, inner_need) in enumerate(constraints):
+            overlapping = {j for cell in inner for j in by_cell[cell]}
+            overlapping.discard(k)
+            for j in overlapping:
+                outer, outer_need = constraints[j]
+                if not inner < outer:
+                    continue
+                rest = outer - inner
+                mines = outer_need - inner_need
+                if mines == 0:
+                    for cell in rest:
+                        if cell not in self.safe:
+                            self.mark_safe(cell)
+                            found = True
+                elif mines == len(rest):
+                    for cell in rest:
+                        if cell not in self.mines:
+                            self.mark_mine(cell)
+                            found = True
+        return found
+
+    def apply_enumeration(self):
+        # Try every mine arrangement of each connected frontier component;
+        # cells that are mines in all of them, or in none, are decided
+        max_mines = self.board.mines - len(self.mines)
+        found = False
+        for cells, constraints in split_components(self.constraints()):
+            if len(cells) > self.max_component:
+                continue
+            by_mines = count_solutions(cells, constraints, max_mines)
+            total = sum(count for count, _ in by_mines.values())
+            if not total:
+                continue
+            hits = [sum(cell_hits[i] for _, cell_hits in by_mines.values())
+                    for i in range(len(cells))]
+            for cell, hit in zip(cells, hits):
+                if hit == 0 and cell not in self.safe:
+                    self.mark_safe(cell)
+                    found = True
+                elif hit == total and cell not in self.mines:
+                    self.mark_mine(cell)
+                    found = True
+        return found
+
+    def apply_mine_count(self):
+        # Endgame: once every mine is accounted for, all other covered cells
+        # are safe
+        if len(self.mines) != self.board.mines:
+            return False
+        found = False
+        for index, cell in enumerate(self.board.cells):
+            if not cell & REVEALED and index not in self.mines and index not in self.safe:
+                self.mark_safe(index)
+                found = True
+        return found
+
+    def deduce(self):
+        # Run the rules from cheapest to most expensive until one finds
+        # something new
+        return (self.apply_single() or self.apply_subset()
+                or self.apply_enumeration() or self.apply_mine_count())
+
+    def solve(self):
+        # Play until the board is won, or logic alone cannot continue.
+        # Returns True when the board was won without guessing.
+        board = self.board
+        while not board.game_over:
+            if not self.safe and not self.deduce():
+                return False
+            while self.safe:
+                row, col = board.coords(self.safe.pop())
+                self.update(board.reveal(row, col))
+        return board.state == WON
+
+
+def split_components(constraints):
+    # Group constraints that share cells, transitively. Returns a list of
+    # (cells, constraints) pairs; components never interact, so each can be
+    # enumerated on its own.
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            parent[find(cell)] = root
+
+    groups = defaultdict(list)
+    for constraint in constraints:
+        groups[find(constraint[0][0])].append(constraint)
+
+    components = []
+    for group in groups.values():
+        # Order cells constraint by constraint, so the enumeration closes
+        # constraints early and prunes as soon as possible
+        cells = list(dict.fromkeys(cell for group_cells, _ in group for cell in group_cells))
+        components.append((cells, group))
+    return components
+
+
+def count_solutions(cells, constraints, max_mines):
+    # Enumerate the mine arrangements of one component that satisfy every
+    # constraint and use at most max_mines mines. Returns
+    # {mines: (solutions, hits)}, where hits[i] counts the solutions that
+    # put a mine on cells[i].
+    #
+    # Cells touched by exactly the same constraints are interchangeable, so
+    # each such group is enumerated once by how many mines it holds: k mines
+    # among n cells stand for comb(n, k) arrangements.
+    position = {cell: i for i, cell in enumerate(cells)}
+    touching = [[] for _ in cells]
+    need = []
+    left = []
+    for k, (constraint_cells, constraint_need) in enumerate(constraints):
+        need.append(constraint_need)
+        left.append(len(constraint_cells))
+        for cell in constraint_cells:
+            touching[position[cell]].append(k)
+
+    grouped = defaultdict(list)
+    for i, ks in enumerate(touching):
+        grouped[tuple(ks)].append(i)
+    groups = [(positions, ks) for ks, positions in grouped.items()]
+    size = len(groups)
+    chosen = [0] * size
+    results = {}
+
+    def search(g, mines, ways):
+        if g == size:
+            count, hits = results.get(mines) or (0, [0] * len(cells))
+            for (positions, _), k in zip(groups, chosen):
+                if k:
+                    # Arrangements with any one given cell of the group mined
+                    share = ways * k // len(positions)
+                    for j in positions:
+                        hits[j] += share
+            results[mines] = (count + ways, hits)
+            return
+        positions, ks = groups[g]
+        n = len(positions)
+        for k in ks:
+            left[k] -= n
+        for value in range(n + 1):
+            if mines + value > max_mines or any(need[k] < value for k in ks):
+                break
+            if all(need[k] - value <= left[k] for k in ks):
+                for k in ks:
+                    need[k] -= value
+                chosen[g] = value
+                search(g + 1, mines + value, ways * comb(n, value))
+                for k in ks:
+                    need[k] += value
+        chosen[g] = 0
+        for k in ks:
+            left[k] += n
+
+    search(0, 0, 1)
+    return results
+
+
+def solve_board(board, row, col):
+    # Whether a fresh board can be won from a first click at (row, col)
+    # without ever guessing
+    solver = Solver(board)
+    solver.update(board.reveal(row, col))
+    return solver.solve()
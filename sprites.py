@@ -0,0 +1,109 @@
+import json
+import os
+import tkinter as tk
+
+ASSETS = 'assets'
+INDEX = 'sprites.json'
+# The cell size the game is designed at, and of the individual GIFs
+BASE_SIZE = 40
+# Sprite name -> individual GIF, the fallback when the atlas cannot be read
+SPRITE_FILES = {
+    'covered': 'cell_covered',
+    'uncovered': 'cell_uncovered',
+    'mine': 'mine',
+    'flag': 'flag',
+    'wrong': 'wrong_mine',
+}
+for i in range(1, 9):
+    SPRITE_FILES[str(i)] = f'number_{i}'
+
+# (Tcl interpreter, cell size) -> {sprite name: PhotoImage}, shared by every
+# game window in the process
+cache = {}
+
+
+def load_sprites(master, size=BASE_SIZE):
+    # Every sprite at the given cell size, decoded on first use only. They
+    # are cut out of the atlas built by create_sprites.py, scaled from the
+    # nearest size it holds when it lacks this one, or read from the
+    # individual GIFs if the atlas is missing or this Tk cannot read PNG.
+    key = (master.tk, size)
+    if key not in cache:
+        cache[key] = load_atlas(master, size) or load_files(master, size)
+    return cache[key]
+
+
+def cell_size(master):
+    # Cell size for the screen: BASE_SIZE at the usual 96 dpi, scaled up
+    # to the nearest atlas size on HiDPI screens
+    scale = master.winfo_fpixels('1i') / 96
+    if scale < 1.25:
+        return BASE_SIZE
+    sizes = atlas_sizes() or [BASE_SIZE]
+    return min(sizes, key=lambda size: abs(size - BASE_SIZE * scale))
+
+
+def read_index():
+    try:
+        with open(os.path.join(ASSETS, INDEX)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def atlas_sizes():
+    index = read_index()
+    return sorted(int(size) for size in index['sizes']) if index else []
+
+
+def scaling(sizes, size):
+    # (source size, zoom, subsample) producing `size` from one of `sizes`:
+    # an exact match, else the smallest multiple to subsample, else the
+    # largest divisor to zoom; None if no whole factor fits
+    if size in sizes:
+        return size, 1, 1
+    larger = [source for source in sizes if source > size and source % size == 0]
+    if larger:
+        return larger[0], 1, larger[0] // size
+    smaller = [source for source in sizes if size % source == 0]
+    if smaller:
+        return smaller[-1], size // smaller[-1], 1
+    return None
+
+
+def cut(master, source, region, zoom, subsample):
+    # A new image holding region (x0, y0, x1, y1) of source, scaled
+    image = tk.PhotoImage(master=master)
+    image.tk.call(image, 'copy', source, '-from', *region,
+                  '-zoom', zoom, '-subsample', subsample)
+    return image
+
+
+def load_atlas(master, size):
+    index = read_index()
+    if index is None:
+        return None
+    found = scaling(sorted(int(size) for size in index['sizes']), size)
+    if found is None:
+        return None
+    source_size, zoom, subsample = found
+    try:
+        atlas = tk.PhotoImage(master=master, file=os.path.join(ASSETS, index['image']))
+    except tk.TclError:
+        return None  # no PNG support before Tk 8.6
+    images = {name: cut(master, atlas, (x, y, x + width, y + height), zoom, subsample)
+              for name, (x, y, width, height) in index['sizes'][str(source_size)].items()}
+    if set(images) != set(SPRITE_FILES):
+        return None  # an index from another version of the game
+    return images
+
+
+def load_files(master, size):
+    images = {name: tk.PhotoImage(master=master, file=os.path.join(ASSETS, f'{filename}.gif'))
+              for name, filename in SPRITE_FILES.items()}
+    found = scaling([BASE_SIZE], size)
+    if found is None or found[1:] == (1, 1):
+        return images
+    _, zoom, subsample = found
+    return {name: cut(master, image, (0, 0, BASE_SIZE, BASE_SIZE), zoom, subsample)
+            for name, image in images.items()}
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from engine import FLAGGED, MINE_BIT, NUMPY, PYTHON, REVEALED, np
+
+BACKENDS = [PYTHON] + ([NUMPY] if np is not None else [])
+
+
+def visible(board):
+    # What a player can see, and the counters derived from it
+    return (bytes(cell & (REVEALED | FLAGGED) for cell in board.cells),
+            board.flags_placed, board.safe_remaining, board.state)
+
+
+def random_move(board, rng, aim=0.98):
+    # A random reveal, flag or chord; returns the cells it changed. Once the
+    # board is generated, a share `aim` of reveals and flags pick safe cells
+    # and mines, so games run long instead of ending on the first mine.
+    cells = board.cells
+    action = rng.choices([board.reveal, board.toggle_flag, board.chord], [6, 2, 2])[0]
+    index = rng.randrange(len(cells))
+    if board.generated and rng.random() < aim:
+        if action == board.reveal:
+            wanted = MINE_BIT | REVEALED, 0
+        elif action == board.toggle_flag:
+            wanted = MINE_BIT | REVEALED, MINE_BIT
+        else:
+            wanted = REVEALED, REVEALED
+        choices = [i for i, cell in enumerate(cells) if cell & wanted[0] == wanted[1]]
+        index = rng.choice(choices or [index])
+    return action(*board.coords(index))
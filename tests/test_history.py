@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from tests.conftest import BACKENDS, random_move, visible
+from engine import LOST, PYTHON, REVEALED, Board
+from movelog import MoveLog, Replay
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('seed', range(20))
+def test_undo_and_redo_round_trip(tmp_path, backend, seed):
+    # Interleave moves with undo and redo, and check each undo restores the
+    # state before its move, each redo the state after it, and that a
+    # replay of the log, undo and redo records included, matches the game
+    rng = random.Random(seed)
+    board = Board(16, 16, 40, backend=backend, seed=seed)
+    board.history = []
+    path = tmp_path / 'game.mslog'
+    board.log = MoveLog(str(path))
+    done = [visible(board)]  # state after each move still in effect
+    undone = []              # states undo has stepped back from
+    logged = [visible(board)]
+    for _ in range(250):
+        roll = rng.random()
+        if roll < 0.2 and board.history:
+            assert board.undo()
+            undone.append(done.pop())
+            assert visible(board) == done[-1]
+        elif roll < 0.3 and undone:
+            assert board.redo()
+            done.append(undone.pop())
+            assert visible(board) == done[-1]
+        elif not board.game_over:
+            if not random_move(board, rng, aim=0.9):
+                continue
+            done.append(visible(board))
+            undone.clear()
+            assert not board.future
+        else:
+            continue
+        logged.append(visible(board))
+    board.log.close()
+    board.log = None
+
+    # Undo everything: back to the untouched board
+    while board.history:
+        board.undo()
+    assert visible(board) == done[0]
+    assert board.state != LOST
+
+    replay = Replay.load(str(path))
+    assert len(replay) == len(logged) - 1
+    for n, state in enumerate(logged):
+        assert visible(replay.board_at(n)) == state
+
+
+def test_new_move_clears_redo():
+    board = Board(9, 9, 10, backend=PYTHON, seed=3)
+    board.history = []
+    board.reveal(4, 4)
+    covered = next(i for i, cell in enumerate(board.cells) if not cell & REVEALED)
+    board.toggle_flag(*board.coords(covered))
+    board.undo()
+    assert board.future
+    board.toggle_flag(*board.coords(covered))
+    assert not board.future
+    assert not board.redo()
+
+
+def test_layout_changes_clear_history():
+    board = Board(9, 9, 10, backend=PYTHON, seed=3)
+    board.history = []
+    board.reveal(4, 4)
+    board.load_cells(bytes(board.cells))
+    assert not board.history and not board.undo()
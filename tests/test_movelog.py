@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from tests.conftest import BACKENDS, random_move, visible
+from engine import MINE_BIT, Board
+from movelog import SNAPSHOT_INTERVAL, MoveLog, Replay, iter_moves, read_varint, varint
+
+
+def play(board, rng, moves):
+    # Returns the visible state after each logged move, starting with the
+    # empty board
+    states = [visible(board)]
+    for _ in range(moves):
+        if board.game_over:
+            break
+        if random_move(board, rng):
+            states.append(visible(board))
+    return states
+
+
+def test_varint_round_trip():
+    for n in [0, 1, 127, 128, 300, 2 ** 32, 2 ** 63 + 5]:
+        assert read_varint(varint(n), 0) == (n, len(varint(n)))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('seed', range(15))
+def test_replay_rebuilds_every_move(tmp_path, backend, seed):
+    rng = random.Random(seed)
+    rows, cols, mines = rng.choice([(9, 9, 10), (16, 16, 40), (16, 30, 99)])
+    board = Board(rows, cols, mines, backend=backend, seed=seed)
+    path = tmp_path / 'game.mslog'
+    board.log = MoveLog(str(path))
+    states = play(board, rng, 300)
+    board.log.close()
+
+    replay = Replay.load(str(path))
+    assert (replay.rows, replay.cols, replay.mines, replay.seed) == (rows, cols, mines, seed)
+    assert len(replay) == len(states) - 1
+    assert len(list(iter_moves(str(path)))) == len(replay)
+    if len(replay) >= SNAPSHOT_INTERVAL:
+        assert replay.snapshots
+    for move, state in enumerate(states):
+        assert visible(replay.board_at(move)) == state
+    assert replay.board_at().mine_bitmap() == board.mine_bitmap()
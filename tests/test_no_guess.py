@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from engine import MINE_BIT, PYTHON, Board
+from no_guess import LayoutSearch, no_guess_layout, repair_candidate
+from solver import solve_board
+
+# Repairs pick up where the solver got stuck, so what they return must still
+# be a board the solver wins from the first click, played afresh.
+
+
+# Seeds whose candidate repairs into a solvable layout, for each size.
+# repair_candidate gives up on the others, and no_guess_layout moves on.
+REPAIRED = {
+    (9, 9, 10): [0, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    (16, 16, 40): range(10),
+    (16, 30, 99): [0, 1, 3, 4, 6, 7, 8, 12, 14, 20],
+    (16, 30, 130): [3, 7, 8, 9, 13, 20, 24, 27, 28, 31],
+}
+
+
+@pytest.mark.parametrize('size, seed', [(size, seed) for size, seeds in REPAIRED.items()
+                                        for seed in seeds])
+def test_repaired_layouts_are_solvable(size, seed):
+    rows, cols, mines = size
+    first = rows // 2 * cols + cols // 2
+    positions = repair_candidate(rows, cols, mines, first, seed)
+    assert positions is not None
+    assert len(positions) == mines and first not in positions
+    board = Board(rows, cols, mines, backend=PYTHON)
+    board.set_mines(positions)
+    assert solve_board(board, *board.coords(first))
+
+
+def test_board_keeps_flags_and_is_solvable():
+    board = Board(16, 30, 99, seed=5, no_guess=True)
+    board.toggle_flag(0, 0)
+    board.reveal(8, 15)
+    assert board.no_guess and board.is_flagged(0, 0)
+    replay = Board(16, 30, 99)
+    replay.set_mines(i for i, cell in enumerate(board.cells) if cell & MINE_BIT)
+    assert solve_board(replay, 8, 15)
+
+
+def test_time_limit():
+    # Far too dense to solve: the search gives up on time rather than
+    # running through every candidate
+    start = time.perf_counter()
+    assert no_guess_layout(16, 30, 300, 255, seed=1, timeout=0.5) is None
+    assert time.perf_counter() - start < 5
+
+
+def test_search_in_background():
+    search = LayoutSearch(16, 30, 99, 255, seed=2)
+    search.thread.join(30)
+    assert search.done()
+    assert search.result == no_guess_layout(16, 30, 99, 255, seed=2)
+
+    search = LayoutSearch(16, 30, 300, 255, seed=1, timeout=60)
+    search.cancel()
+    search.thread.join(30)
+    assert search.done() and search.result is None
@@ -0,0 +1,96 @@
+import itertools
+import random
+
+import pytest
+
+from engine import COUNT_MASK, FLAGGED, MINE_BIT, PYTHON, REVEALED, Board
+from probability import ProbabilityEngine
+from solver import count_solutions
+
+# The probability engine and the solver's component counting checked
+# against brute-force enumeration of every mine layout on small boards.
+
+
+def brute_force(board):
+    # Mine probability of every covered cell, over all layouts that agree
+    # with the revealed numbers, the flags and the mine total
+    cells = board.cells
+    covered = [i for i, cell in enumerate(cells) if not cell & REVEALED]
+    flags = {i for i in covered if cells[i] & FLAGGED}
+    numbers = [(i, cells[i] & COUNT_MASK) for i, cell in enumerate(cells) if cell & REVEALED]
+    hits = dict.fromkeys(covered, 0)
+    total = 0
+    for layout in itertools.combinations(covered, board.mines):
+        mines = set(layout)
+        if not flags <= mines:
+            continue
+        if all(sum(n in mines for n in board.neighbours(i)) == count for i, count in numbers):
+            total += 1
+            for i in mines:
+                hits[i] += 1
+    return {i: count / total for i, count in hits.items()}
+
+
+def position(seed):
+    # A small board part-way through a game, sometimes with a correct flag
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 5), rng.randint(3, 5)
+    mines = rng.randint(1, min(6, rows * cols - 2))
+    board = Board(rows, cols, mines, backend=PYTHON, seed=seed, safe_neighbours=False)
+    engine = ProbabilityEngine(board)
+    engine.update(board.reveal(*board.coords(rng.randrange(rows * cols))))
+    for _ in range(rng.randint(0, 3)):
+        safe = [i for i, cell in enumerate(board.cells) if not cell & (REVEALED | MINE_BIT)]
+        if board.game_over or not safe:
+            break
+        engine.update(board.reveal(*board.coords(rng.choice(safe))))
+    if not board.game_over and rng.random() < 0.5:
+        mines = [i for i, cell in enumerate(board.cells) if cell & MINE_BIT]
+        engine.update(board.toggle_flag(*board.coords(rng.choice(mines))))
+    return board, engine
+
+
+@pytest.mark.parametrize('seed', range(80))
+def test_probabilities_match_brute_force(seed):
+    board, engine = position(seed)
+    if board.game_over:
+        pytest.skip("the opening click finished the game")
+    expected = brute_force(board)
+    probabilities = engine.probabilities()
+    assert set(probabilities) == set(expected)
+    for index, p in expected.items():
+        assert probabilities[index] == pytest.approx(p, abs=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(80))
+def test_incremental_updates_match_a_fresh_engine(seed):
+    board, engine = position(seed)
+    if board.game_over:
+        pytest.skip("the opening click finished the game")
+    assert engine.probabilities() == pytest.approx(ProbabilityEngine(board).probabilities())
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_count_solutions_matches_brute_force(seed):
+    # Random overlapping constraints over up to 10 cells, every cell in at
+    # least one, so groups of interchangeable cells are common
+    rng = random.Random(seed)
+    cells = list(range(rng.randint(1, 10)))
+    constraints = []
+    uncovered = set(cells)
+    while uncovered or len(constraints) < 2:
+        members = rng.sample(cells, rng.randint(1, len(cells)))
+        constraints.append((members, rng.randint(0, len(members))))
+        uncovered -= set(members)
+    max_mines = rng.randint(0, len(cells))
+
+    expected = {}
+    for layout in itertools.product((0, 1), repeat=len(cells)):
+        mines = sum(layout)
+        if mines > max_mines:
+            continue
+        if all(sum(layout[c] for c in members) == need for members, need in constraints):
+            count, hits = expected.get(mines) or (0, [0] * len(cells))
+            expected[mines] = (count + 1, [h + m for h, m in zip(hits, layout)])
+
+    assert count_solutions(cells, constraints, max_mines) == expected
@@ -0,0 +1,30 @@
+import pytest
+
+from engine import DIFFICULTY, LOST, MINE_BIT, PYTHON, REVEALED, WON, Board
+from solver import Solver
+
+# Soundness: every cell the solver deduces is right, so playing only its
+# deductions never loses, on any board.
+
+BOARDS = [(s['rows'], s['cols'], s['mines']) for s in DIFFICULTY.values()]
+
+
+@pytest.mark.parametrize('size', BOARDS, ids=list(DIFFICULTY))
+@pytest.mark.parametrize('seed', range(40))
+def test_deductions_are_sound(size, seed):
+    rows, cols, mines = size
+    board = Board(rows, cols, mines, backend=PYTHON, seed=seed)
+    cells = board.cells
+    solver = Solver(board)
+    solver.update(board.reveal(rows // 2, cols // 2))
+    while not board.game_over and (solver.safe or solver.deduce()):
+        assert all(cells[i] & MINE_BIT for i in solver.mines)
+        assert not any(cells[i] & MINE_BIT for i in solver.safe)
+        while solver.safe:
+            solver.update(board.reveal(*board.coords(solver.safe.pop())))
+        assert board.state != LOST
+    if board.state == WON:
+        return
+    # Stuck: every covered cell left is one logic cannot decide
+    assert not solver.safe
+    assert any(not cell & REVEALED and i not in solver.mines for i, cell in enumerate(cells))